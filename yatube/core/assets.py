@@ -0,0 +1,210 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.contrib.staticfiles.storage import (
+    StaticFilesStorage, staticfiles_storage,
+)
+from django.utils.functional import cached_property
+
+from .constants import (
+    ASSETS_BROTLI_QUALITY, ASSETS_COMPRESSIBLE, ASSETS_GZIP_LEVEL,
+    ASSETS_HASH_LENGTH, ASSETS_IGNORE_PATTERNS, ASSETS_MANIFEST_NAME,
+    ASSETS_MANIFEST_VERSION, ASSETS_NESTED_AT_RULES, ASSETS_PURGE_CSS,
+    ASSETS_PURGE_SAFELIST, ASSETS_PURGE_SCRIPTS,
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CSS_TOKEN_RE = re.compile(
+    r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/|[{};]', re.S
+)
+CONTENT_TOKEN_RE = re.compile(r"[\w-]+")
+SELECTOR_TOKEN_RE = re.compile(r"[.#](-?[_a-zA-Z][\w-]*)")
+SELECTOR_IGNORED_RE = re.compile(r"\[[^\]]*\]|:not\([^()]*\)")
+
+
+class AssetsStorage(StaticFilesStorage):
+    @cached_property
+    def manifest(self):
+        try:
+            with open(self.path(ASSETS_MANIFEST_NAME)) as file:
+                return json.load(file)["paths"]
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    @cached_property
+    def hashed_names(self):
+        return frozenset(self.manifest.values())
+
+    def url(self, name):
+        # runserver раздает исходники из STATICFILES_DIRS, где хешированных
+        # имен нет.
+        if settings.ASSETS_USE_MANIFEST:
+            name = self.manifest.get(name, name)
+        return super().url(name)
+
+
+def is_hashed_asset(path):
+    return path in getattr(staticfiles_storage, "hashed_names", ())
+
+
+def _css_blocks(css):
+    """Разбирает CSS на инструкции и блоки «прелюдия {тело}» одного уровня.
+    Инструкции без тела и сохраняемые комментарии /*! отдаются с телом None.
+    """
+    start = depth = 0
+    prelude = None
+    for match in CSS_TOKEN_RE.finditer(css):
+        token = match.group()
+        if depth == 0 and token.startswith("/*"):
+            if token.startswith("/*!"):
+                yield token, None
+            start = match.end()
+        elif token == "{":
+            if depth == 0:
+                prelude = css[start:match.start()].strip()
+                start = match.end()
+            depth += 1
+        elif token == "}":
+            depth -= 1
+            if depth == 0:
+                yield prelude, css[start:match.start()]
+                start = match.end()
+        elif token == ";" and depth == 0:
+            yield css[start:match.end()].strip(), None
+            start = match.end()
+
+
+def _split_selectors(prelude):
+    selectors = []
+    depth = start = 0
+    for position, char in enumerate(prelude):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            selectors.append(prelude[start:position].strip())
+            start = position + 1
+    selectors.append(prelude[start:].strip())
+    return selectors
+
+
+def is_selector_used(selector, used):
+    return all(
+        token in used
+        for token in SELECTOR_TOKEN_RE.findall(
+            SELECTOR_IGNORED_RE.sub("", selector)
+        )
+    )
+
+
+def purge_css(css, used):
+    output = []
+    for prelude, body in _css_blocks(css):
+        if body is None:
+            output.append(prelude)
+        elif prelude.startswith("@"):
+            if prelude.lower().startswith(ASSETS_NESTED_AT_RULES):
+                body = purge_css(body, used)
+                if not body:
+                    continue
+            output.append(f"{prelude}{{{body}}}")
+        else:
+            selectors = [
+                selector for selector in _split_selectors(prelude)
+                if is_selector_used(selector, used)
+            ]
+            if selectors:
+                output.append(f"{','.join(selectors)}{{{body}}}")
+    return "".join(output)
+
+
+def collect_used_tokens(template_dirs, scripts=()):
+    used = set(ASSETS_PURGE_SAFELIST)
+    paths = list(scripts)
+    for directory in template_dirs:
+        for root, _, files in os.walk(directory):
+            paths.extend(
+                os.path.join(root, name)
+                for name in files if name.endswith(".html")
+            )
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            used.update(CONTENT_TOKEN_RE.findall(file.read()))
+    return used
+
+
+def find_static_files():
+    found = {}
+    for finder in get_finders():
+        for path, storage in finder.list(ASSETS_IGNORE_PATTERNS):
+            name = path.replace(os.sep, "/")
+            prefix = getattr(storage, "prefix", None)
+            if prefix:
+                name = f"{prefix}/{name}"
+            found.setdefault(name, (storage, path))
+    return found
+
+
+def hashed_name(name, content):
+    digest = hashlib.md5(content).hexdigest()[:ASSETS_HASH_LENGTH]
+    base, extension = os.path.splitext(name)
+    return f"{base}.{digest}{extension}"
+
+
+def compressed_variants(name, content):
+    if not name.lower().endswith(ASSETS_COMPRESSIBLE):
+        return
+    variants = [(".gz", gzip.compress(content, ASSETS_GZIP_LEVEL, mtime=0))]
+    if brotli is not None:
+        variants.append(
+            (".br", brotli.compress(content, quality=ASSETS_BROTLI_QUALITY))
+        )
+    for suffix, compressed in variants:
+        if len(compressed) < len(content):
+            yield suffix, compressed
+
+
+def _write(root, name, content):
+    path = os.path.join(root, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.partial", "wb") as file:
+        file.write(content)
+    os.replace(f"{path}.partial", path)
+
+
+def build_assets(root, template_dirs, report=None):
+    files = find_static_files()
+    scripts = [
+        files[name][0].path(files[name][1])
+        for name in ASSETS_PURGE_SCRIPTS if name in files
+    ]
+    used = collect_used_tokens(template_dirs, scripts)
+    manifest = {}
+    for name, (storage, path) in sorted(files.items()):
+        with storage.open(path) as file:
+            content = file.read()
+        if name in ASSETS_PURGE_CSS:
+            purged = purge_css(content.decode(), used).encode()
+            if report:
+                report(name, len(content), len(purged))
+            content = purged
+        manifest[name] = hashed_name(name, content)
+        for target in (name, manifest[name]):
+            _write(root, target, content)
+            for suffix, compressed in compressed_variants(target, content):
+                _write(root, target + suffix, compressed)
+    _write(root, ASSETS_MANIFEST_NAME, json.dumps(
+        {"version": ASSETS_MANIFEST_VERSION, "paths": manifest},
+        indent=2, sort_keys=True,
+    ).encode())
+    return manifest
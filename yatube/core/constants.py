@@ -0,0 +1,16 @@
+ASSETS_MANIFEST_NAME = "assets.json"
+ASSETS_MANIFEST_VERSION = 1
+ASSETS_HASH_LENGTH = 12
+ASSETS_IGNORE_PATTERNS = ("CVS", ".*", "*~")
+ASSETS_PURGE_CSS = ("css/bootstrap.min.css",)
+# Скрипты, из которых берутся классы, добавляемые на странице.
+ASSETS_PURGE_SCRIPTS = ("js/comments.js", "js/lookup.js")
+# Классы состояний, которые выставляет bootstrap.bundle.min.js.
+ASSETS_PURGE_SAFELIST = (
+    "active", "collapse", "collapsed", "collapsing", "disabled", "fade",
+    "show", "showing", "was-validated",
+)
+ASSETS_NESTED_AT_RULES = ("@media", "@supports", "@layer", "@container")
+ASSETS_COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".map", ".ico")
+ASSETS_GZIP_LEVEL = 9
+ASSETS_BROTLI_QUALITY = 11
@@ -0,0 +1,225 @@
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.http import (
+    http_date, parse_etags, parse_http_date_safe, quote_etag,
+)
+from django.views.decorators.http import require_safe
+
+# Имена по хешу содержимого: sha256 у картинок постов, md5 у миниатюр sorl,
+# суффикс ширины у вариантов картинок.
+CONTENT_NAME_RE = re.compile(r"^(?:[0-9a-f]{32}){1,2}(?:_\d+w)?\.\w+$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+class FileRange:
+    # fileno() оставлен, чтобы wsgi.file_wrapper сервера мог отдать
+    # диапазон через os.sendfile.
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def file_etag(stat_result):
+    return quote_etag(hashlib.md5(
+        f"{stat_result.st_ino}:{stat_result.st_size}:"
+        f"{stat_result.st_mtime_ns}".encode()
+    ).hexdigest())
+
+
+def is_content_addressed(path):
+    return bool(CONTENT_NAME_RE.match(os.path.basename(path)))
+
+
+def parse_range(header, size):
+    match = RANGE_RE.match(header.replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None
+    start, end = match.groups()
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end or size - 1), size - 1)
+    if start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def not_modified(request, etag, mtime):
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return "*" in etags or etag in etags
+    since = parse_http_date_safe(
+        request.META.get("HTTP_IF_MODIFIED_SINCE", "")
+    )
+    return since is not None and int(mtime) <= since
+
+
+def requested_range(request, etag, mtime, size):
+    header = request.META.get("HTTP_RANGE")
+    if not header or size == 0:
+        return None
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range and if_range != etag and (
+        parse_http_date_safe(if_range) != int(mtime)
+    ):
+        return None
+    return parse_range(header, size)
+
+
+def precompressed_variants(full_path):
+    return [
+        (encoding, full_path + suffix)
+        for encoding, suffix in PRECOMPRESSED
+        if os.path.isfile(full_path + suffix)
+    ]
+
+
+def parse_quality(params):
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0
+    return 1
+
+
+def accepted_encodings(header):
+    accepted = {}
+    for coding in header.split(","):
+        encoding, *params = coding.split(";")
+        encoding = encoding.strip().lower()
+        if encoding:
+            accepted[encoding] = parse_quality(params)
+    return accepted
+
+
+def negotiate_encoding(request, variants):
+    accepted = accepted_encodings(
+        request.META.get("HTTP_ACCEPT_ENCODING", "")
+    )
+    # При равном q выбирается первый вариант: br сжимает лучше gzip.
+    ranked = sorted(
+        (
+            (encoding, path) for encoding, path in variants
+            if accepted.get(encoding, 0) > 0
+        ),
+        key=lambda variant: -accepted[variant[0]],
+    )
+    return ranked[0] if ranked else (None, None)
+
+
+def select_encoding(request, full_path, stat_result):
+    variants = precompressed_variants(full_path)
+    encoding, encoded_path = negotiate_encoding(request, variants)
+    headers = {"Vary": "Accept-Encoding"} if variants else {}
+    if encoding is None:
+        return full_path, stat_result, headers
+    headers["Content-Encoding"] = encoding
+    return encoded_path, os.stat(encoded_path), headers
+
+
+def offload_headers(full_path, url_path):
+    backend = settings.FILES_SENDFILE_BACKEND
+    if backend == "x-sendfile":
+        return {"X-Sendfile": full_path}
+    if backend == "x-accel-redirect":
+        return {
+            "X-Accel-Redirect":
+                settings.FILES_ACCEL_REDIRECT_PREFIX + url_path,
+        }
+    return None
+
+
+def cache_headers(etag, mtime, immutable):
+    return {
+        "ETag": etag,
+        "Last-Modified": http_date(mtime),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": (
+            f"public, max-age={settings.FILES_IMMUTABLE_MAX_AGE}, immutable"
+            if immutable
+            else f"public, max-age={settings.FILES_MAX_AGE}"
+        ),
+    }
+
+
+def file_response(full_path, byte_range, size, headers):
+    file = open(full_path, "rb")
+    if byte_range is None:
+        headers["Content-Length"] = size
+        return FileResponse(file)
+    start, end = byte_range
+    file.seek(start)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = end - start + 1
+    return FileResponse(FileRange(file, end - start + 1), status=206)
+
+
+@require_safe
+def serve_file(request, path, document_root,
+               is_immutable=is_content_addressed):
+    try:
+        full_path = safe_join(document_root, path)
+        stat_result = os.stat(full_path)
+    except (OSError, ValueError, SuspiciousFileOperation):
+        raise Http404("Файл не найден")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404("Файл не найден")
+    # FileResponse угадывает тип по имени, а у .gz/.br он неверный.
+    content_type = (
+        mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    )
+    served_path, stat_result, encoding_headers = select_encoding(
+        request, full_path, stat_result
+    )
+    url_path = request.path + served_path[len(full_path):]
+    full_path = served_path
+    etag = file_etag(stat_result)
+    mtime = stat_result.st_mtime
+    headers = cache_headers(etag, mtime, is_immutable(path))
+    headers.update(encoding_headers)
+    offload = offload_headers(full_path, url_path)
+    if not_modified(request, etag, mtime):
+        response = HttpResponse(status=304)
+    elif offload:
+        # Фронтенд сам отдаст файл вместе с диапазонами.
+        response = HttpResponse(content_type=content_type)
+        headers.update(offload)
+    else:
+        size = stat_result.st_size
+        try:
+            byte_range = requested_range(request, etag, mtime, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+        response = file_response(full_path, byte_range, size, headers)
+        headers["Content-Type"] = content_type
+    for header, value in headers.items():
+        response[header] = value
+    return response
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.assets import brotli, build_assets
+
+
+class Command(BaseCommand):
+    help = (
+        "Собирает статику в STATIC_ROOT: вырезает неиспользуемые шаблонами "
+        "селекторы CSS, добавляет хеш в имена файлов, сжимает gzip и brotli "
+        "и записывает манифест"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--template-dir",
+            action="append",
+            dest="template_dirs",
+            help="Каталог шаблонов, по которому ищутся используемые классы",
+        )
+
+    def handle(self, *args, **options):
+        template_dirs = options["template_dirs"] or [settings.TEMPLATES_DIR]
+        verbosity = options["verbosity"]
+
+        def report(name, size, purged_size):
+            if verbosity > 1:
+                self.stdout.write(f"{name}: {size} -> {purged_size} байт")
+
+        if brotli is None and verbosity > 0:
+            self.stdout.write(self.style.WARNING(
+                "Модуль brotli не установлен, файлы .br не создаются"
+            ))
+        manifest = build_assets(settings.STATIC_ROOT, template_dirs, report)
+        self.stdout.write(self.style.SUCCESS(
+            f"Собрано файлов: {len(manifest)} в {settings.STATIC_ROOT}"
+        ))
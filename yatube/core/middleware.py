@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+
+
+class AnonymousRequestMiddleware:
+    """Отдает анонимным GET-запросам пользователя без обращения к сессии,
+    чтобы ответ не получал Vary: Cookie и мог кэшироваться прокси.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (request.method in ("GET", "HEAD")
+                and settings.SESSION_COOKIE_NAME not in request.COOKIES):
+            request.user = AnonymousUser()
+        return self.get_response(request)
@@ -0,0 +1,119 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from ..assets import AssetsStorage, build_assets, hashed_name, purge_css
+from ..constants import ASSETS_MANIFEST_NAME
+
+TEMP_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SOURCE_DIR = os.path.join(TEMP_DIR, "static")
+TEMPLATES_DIR = os.path.join(TEMP_DIR, "templates")
+STATIC_ROOT = os.path.join(TEMP_DIR, "collected")
+CSS = (
+    '@charset "UTF-8";/*! license */:root{--x:1}body{margin:0}'
+    ".card,.modal{padding:1px}.modal-body{padding:2px}"
+    ".btn:not(.disabled):hover{color:red}"
+    '[href=".unused"]{color:blue}'
+    "@media (min-width:768px){.col-md-8{flex:0 0 auto}"
+    ".col-md-3{flex:0}}"
+    "@keyframes spin{to{transform:rotate(360deg)}}"
+    "/* dropped */"
+)
+
+
+class PurgeCssTests(SimpleTestCase):
+    def test_purge(self):
+        """Проверяем, что остаются только селекторы используемых классов."""
+        self.assertEqual(
+            purge_css(CSS, {"card", "btn", "col-md-8"}),
+            '@charset "UTF-8";/*! license */:root{--x:1}body{margin:0}'
+            ".card{padding:1px}.btn:not(.disabled):hover{color:red}"
+            '[href=".unused"]{color:blue}'
+            "@media (min-width:768px){.col-md-8{flex:0 0 auto}}"
+            "@keyframes spin{to{transform:rotate(360deg)}}",
+        )
+
+    def test_empty_at_rules_dropped(self):
+        """Проверяем, что опустевшие @media удаляются целиком."""
+        self.assertNotIn("@media", purge_css(CSS, set()))
+
+
+@override_settings(
+    STATICFILES_DIRS=[SOURCE_DIR],
+    STATICFILES_FINDERS=[
+        "django.contrib.staticfiles.finders.FileSystemFinder",
+    ],
+    STATIC_ROOT=STATIC_ROOT,
+)
+class BuildAssetsTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(SOURCE_DIR, "css"))
+        os.makedirs(TEMPLATES_DIR)
+        with open(os.path.join(SOURCE_DIR, "css/bootstrap.min.css"), "w") as f:
+            f.write(CSS)
+        with open(os.path.join(SOURCE_DIR, "robots.txt"), "w") as f:
+            f.write("User-agent: *\n" * 100)
+        with open(os.path.join(TEMPLATES_DIR, "base.html"), "w") as f:
+            f.write('<div class="card col-md-8">{{ text }}</div>')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def read(self, name, mode="r"):
+        with open(os.path.join(STATIC_ROOT, name), mode) as file:
+            return file.read()
+
+    def test_build(self):
+        """Проверяем чистку CSS, хешированные имена, сжатие и манифест."""
+        manifest = build_assets(STATIC_ROOT, [TEMPLATES_DIR])
+        css = self.read("css/bootstrap.min.css")
+        self.assertIn(".card{", css)
+        self.assertIn(".col-md-8{", css)
+        self.assertNotIn(".modal", css)
+        hashed = manifest["css/bootstrap.min.css"]
+        self.assertEqual(
+            hashed, hashed_name("css/bootstrap.min.css", css.encode())
+        )
+        self.assertEqual(self.read(hashed), css)
+        self.assertEqual(
+            json.loads(self.read(ASSETS_MANIFEST_NAME))["paths"], manifest
+        )
+        self.assertEqual(
+            gzip.decompress(self.read("robots.txt.gz", "rb")),
+            self.read("robots.txt", "rb"),
+        )
+        self.assertTrue(
+            os.path.exists(os.path.join(STATIC_ROOT, f"{hashed}.gz"))
+        )
+
+    @override_settings(ASSETS_USE_MANIFEST=True)
+    def test_storage_urls(self):
+        """Проверяем, что {% static %} ведет на хешированные имена."""
+        manifest = build_assets(STATIC_ROOT, [TEMPLATES_DIR])
+        storage = AssetsStorage(location=STATIC_ROOT)
+        self.assertEqual(
+            storage.url("css/bootstrap.min.css"),
+            settings.STATIC_URL + manifest["css/bootstrap.min.css"],
+        )
+        self.assertEqual(
+            storage.url("css/missing.css"),
+            settings.STATIC_URL + "css/missing.css",
+        )
+        self.assertIn(manifest["css/bootstrap.min.css"], storage.hashed_names)
+        self.assertNotIn("css/bootstrap.min.css", storage.hashed_names)
+        with override_settings(ASSETS_USE_MANIFEST=False):
+            self.assertEqual(
+                AssetsStorage(location=STATIC_ROOT).url(
+                    "css/bootstrap.min.css"
+                ),
+                settings.STATIC_URL + "css/bootstrap.min.css",
+            )
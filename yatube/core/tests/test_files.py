@@ -0,0 +1,199 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+from ..files import serve_file
+
+TEMP_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = bytes(range(256)) * 4
+CONTENT_NAME = "posts/01/23/" + "0123456789abcdef" * 4 + ".jpg"
+CAMERA_NAME = "posts/PXL_20220315123456789.jpg"
+
+
+@override_settings(
+    FILES_SENDFILE_BACKEND=None, FILES_MAX_AGE=60,
+    FILES_IMMUTABLE_MAX_AGE=31536000,
+)
+class ServeFileTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.factory = RequestFactory()
+        os.makedirs(os.path.join(TEMP_ROOT, "posts/01/23"), exist_ok=True)
+        for name in ("data.bin", CONTENT_NAME, CAMERA_NAME):
+            with open(os.path.join(TEMP_ROOT, name), "wb") as file:
+                file.write(CONTENT)
+        with open(os.path.join(TEMP_ROOT, "app.css"), "wb") as file:
+            file.write(b"body{}" * 100)
+        with open(os.path.join(TEMP_ROOT, "app.css.gz"), "wb") as file:
+            file.write(gzip.compress(b"body{}" * 100))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def serve(self, path="data.bin", method="get", **headers):
+        request = getattr(self.factory, method)(f"/media/{path}", **headers)
+        return serve_file(request, path, TEMP_ROOT)
+
+    def close(self, response):
+        # response.close() отправил бы request_finished и закрыл
+        # соединения с базой, которых у SimpleTestCase нет.
+        response.file_to_stream.close()
+
+    def content(self, response):
+        content = b"".join(response.streaming_content)
+        self.close(response)
+        return content
+
+    def test_full_file(self):
+        """Проверяем, что файл отдается целиком с валидаторами кеша."""
+        response = self.serve()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.content(response), CONTENT)
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+
+    def test_head(self):
+        """Проверяем, что HEAD отдает заголовки без тела."""
+        response = self.serve(method="head")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], str(len(CONTENT)))
+        self.close(response)
+
+    def test_not_modified(self):
+        """Проверяем ответ 304 на If-None-Match и If-Modified-Since."""
+        etag = self.serve()["ETag"]
+        self.assertEqual(
+            self.serve(HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+        mtime = os.stat(os.path.join(TEMP_ROOT, "data.bin")).st_mtime
+        self.assertEqual(
+            self.serve(HTTP_IF_MODIFIED_SINCE=http_date(mtime)).status_code,
+            304,
+        )
+
+    def test_ranges(self):
+        """Проверяем, что диапазоны байт отдаются ответом 206."""
+        cases = (
+            ("bytes=10-19", 10, 19),
+            ("bytes=1000-", 1000, 1023),
+            ("bytes=-24", 1000, 1023),
+            ("bytes=1020-5000", 1020, 1023),
+        )
+        for header, start, end in cases:
+            with self.subTest(header=header):
+                response = self.serve(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(
+                    response["Content-Range"],
+                    f"bytes {start}-{end}/{len(CONTENT)}",
+                )
+                self.assertEqual(
+                    response["Content-Length"], str(end - start + 1)
+                )
+                self.assertEqual(
+                    self.content(response), CONTENT[start:end + 1]
+                )
+
+    def test_unsatisfiable_range(self):
+        """Проверяем ответ 416 на диапазон за концом файла."""
+        response = self.serve(HTTP_RANGE="bytes=5000-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_if_range_mismatch(self):
+        """Проверяем, что при устаревшем If-Range файл отдается целиком."""
+        response = self.serve(
+            HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.content(response), CONTENT)
+
+    def test_immutable_name(self):
+        """Проверяем долгое кеширование только файлов с именем по хешу
+        содержимого.
+        """
+        cases = (
+            (CONTENT_NAME, "public, max-age=31536000, immutable"),
+            (CAMERA_NAME, "public, max-age=60"),
+        )
+        for path, cache_control in cases:
+            with self.subTest(path=path):
+                response = self.serve(path)
+                self.assertEqual(response["Cache-Control"], cache_control)
+                self.close(response)
+
+    def test_immutable_hook(self):
+        """Проверяем, что неизменяемые имена задаются параметром view."""
+        request = self.factory.get("/static/data.bin")
+        response = serve_file(
+            request, "data.bin", TEMP_ROOT,
+            is_immutable=lambda path: path == "data.bin",
+        )
+        self.assertIn("immutable", response["Cache-Control"])
+        self.close(response)
+
+    @override_settings(FILES_SENDFILE_BACKEND="x-accel-redirect")
+    def test_accel_redirect(self):
+        """Проверяем передачу файла nginx через X-Accel-Redirect."""
+        response = self.serve()
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            settings.FILES_ACCEL_REDIRECT_PREFIX + "/media/data.bin",
+        )
+        self.assertEqual(response.content, b"")
+
+    @override_settings(FILES_SENDFILE_BACKEND="x-sendfile")
+    def test_sendfile(self):
+        """Проверяем передачу файла через X-Sendfile."""
+        response = self.serve()
+        self.assertEqual(
+            response["X-Sendfile"], os.path.join(TEMP_ROOT, "data.bin")
+        )
+
+    def test_precompressed(self):
+        """Проверяем отдачу заранее сжатого варианта по Accept-Encoding."""
+        response = self.serve("app.css", HTTP_ACCEPT_ENCODING="br, gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(
+            gzip.decompress(self.content(response)), b"body{}" * 100
+        )
+        response = self.serve("app.css")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(self.content(response), b"body{}" * 100)
+
+    def test_precompressed_quality(self):
+        """Проверяем, что q=0 запрещает кодировку, а без сжатого варианта
+        отдается исходный файл.
+        """
+        cases = (
+            ("gzip;q=0", None),
+            ("gzip; q=0.0, identity", None),
+            ("br;q=1, gzip;q=0.5", "gzip"),
+            ("GZIP;q=0.1", "gzip"),
+            ("gzip;q=bad", None),
+        )
+        for header, encoding in cases:
+            with self.subTest(header=header):
+                response = self.serve("app.css", HTTP_ACCEPT_ENCODING=header)
+                self.assertEqual(response.get("Content-Encoding"), encoding)
+                self.close(response)
+
+    def test_missing_files(self):
+        """Проверяем 404 для отсутствующих файлов и путей вне корня."""
+        for path in ("missing.bin", "css", "../settings.py"):
+            with self.subTest(path=path):
+                with self.assertRaises(Http404):
+                    self.serve(path)
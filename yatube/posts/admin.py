@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import Group, Post
+from .follows import bulk_unfollow
+from .models import Follow, Group, Post
+from .search import filter_by_search, match_expression, search_enabled
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,6 +12,13 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("pub_date",)
     empty_value_display = "-пусто-"
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_enabled() or not match_expression(search_term):
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return filter_by_search(queryset, search_term), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ("title", "slug", "description",)
@@ -17,5 +26,22 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = "-пусто-"
 
 
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ("pk", "user", "author",)
+    search_fields = ("user__username", "author__username",)
+    raw_id_fields = ("user", "author",)
+
+    def get_readonly_fields(self, request, obj=None):
+        # Счетчики и ленты обновляются сигналами только при создании и
+        # удалении подписки.
+        if obj is not None:
+            return ("user", "author",)
+        return ()
+
+    def delete_queryset(self, request, queryset):
+        bulk_unfollow(queryset.values_list("user_id", "author_id"))
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(Follow, FollowAdmin)
@@ -0,0 +1,106 @@
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .constants import (
+    COUNT_CACHE_TIMEOUT, FEED_GENERATION, FRAGMENT_CACHE_TIMEOUT,
+)
+
+
+def get_generation(name):
+    return cache.get_or_set(
+        f"generation:{name}", int(time.time() * 1000), timeout=None
+    )
+
+
+def increment(key, delta=1):
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.set(key, delta, timeout=None)
+        return delta
+
+
+def bump_generation(name):
+    get_generation(name)
+    return increment(f"generation:{name}")
+
+
+def touch_generation(name):
+    # Значение - время изменения в мс для Last-Modified. Заголовок точен до
+    # секунды, поэтому каждое изменение сдвигает его хотя бы на секунду.
+    value = max(math.ceil(time.time()) * 1000, get_generation(name) + 1000)
+    cache.set(f"generation:{name}", value, timeout=None)
+    return value
+
+
+def cached_count(queryset):
+    if not hasattr(queryset, "query"):
+        return queryset.count()
+    signature = hashlib.md5(str(queryset.query).encode()).hexdigest()
+    key = "count:{}:{}:{}".format(
+        queryset.model._meta.label_lower,
+        get_generation(queryset.model._meta.label_lower),
+        signature,
+    )
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def fragment_cache_context(page):
+    return {
+        "page_key": page or 1,
+        "fragment_timeout": FRAGMENT_CACHE_TIMEOUT,
+        "cache_generation": get_generation(FEED_GENERATION),
+    }
+
+
+def _is_cacheable_request(request):
+    return (
+        request.method in ("GET", "HEAD")
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and settings.CSRF_COOKIE_NAME not in request.COOKIES
+    )
+
+
+def _is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.cookies
+        and not request.META.get("CSRF_COOKIE_USED")
+        and not response.has_header("Cache-Control")
+    )
+
+
+def cache_anonymous_response(view_name, generations=(FEED_GENERATION,),
+                             view_generations=None):
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            timeout = settings.POSTS_RESPONSE_CACHE_TIMEOUTS.get(view_name)
+            if not timeout or not _is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+            names = generations
+            if view_generations is not None:
+                names = (*names, *view_generations(*args, **kwargs))
+            key = "response:{}:{}:{}".format(
+                view_name,
+                ":".join(str(get_generation(name)) for name in names),
+                hashlib.md5(request.get_full_path().encode()).hexdigest(),
+            )
+            response = cache.get(key)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                if _is_cacheable_response(request, response):
+                    cache.set(key, response, timeout)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,77 @@
+import hashlib
+from datetime import datetime, timezone
+
+from .caching import get_generation
+from .constants import COMMENTS_GENERATION, FEED_GENERATION
+
+
+def follows_generation(user_id):
+    return f"follows:{user_id}"
+
+
+def followers_generation(username):
+    return "followers:{}".format(hashlib.md5(username.encode()).hexdigest())
+
+
+def profile_generations(username):
+    return (followers_generation(username),)
+
+
+def _user_key(request):
+    user = request.user
+    if not user.is_authenticated:
+        return "anonymous"
+    return "{}:{}".format(
+        user.pk, get_generation(follows_generation(user.pk))
+    )
+
+
+def make_etag(*generations):
+    def etag(request, *args, **kwargs):
+        parts = (
+            request.get_full_path(),
+            _user_key(request),
+            *(str(get_generation(name)) for name in generations),
+        )
+        return hashlib.md5(":".join(parts).encode()).hexdigest()
+    return etag
+
+
+def generation_modified(*generations):
+    # Поколения меняются через touch_generation, их значения - время
+    # последнего изменения в мс. Правки и удаления постов меняют их так же,
+    # как новые посты.
+    return datetime.fromtimestamp(
+        max(get_generation(name) for name in generations) / 1000,
+        timezone.utc,
+    )
+
+
+def feed_last_modified(request, *args, **kwargs):
+    return generation_modified(FEED_GENERATION)
+
+
+def profile_last_modified(request, username):
+    return generation_modified(
+        FEED_GENERATION, followers_generation(username)
+    )
+
+
+def profile_etag(request, username):
+    return make_etag(FEED_GENERATION, followers_generation(username))(
+        request, username
+    )
+
+
+def follow_last_modified(request):
+    return generation_modified(
+        FEED_GENERATION, follows_generation(request.user.pk)
+    )
+
+
+def post_last_modified(request, post_id):
+    return generation_modified(FEED_GENERATION, COMMENTS_GENERATION)
+
+
+feed_etag = make_etag(FEED_GENERATION)
+post_etag = make_etag(FEED_GENERATION, COMMENTS_GENERATION)
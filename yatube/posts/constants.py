@@ -1,3 +1,59 @@
 POST_PER_PAGE = 10
 CHARS_LIMIT_POST = 15
 CHARS_LIMIT_COMMENT = 15
+PAGINATION_PAGE = "page"
+PAGINATION_CURSOR = "cursor"
+PAGINATION_CACHED = "cached"
+PAGINATION_COUNTLESS = "countless"
+COUNT_CACHE_TIMEOUT = 60 * 60
+FOLLOW_FEED_JOIN = "join"
+FOLLOW_FEED_TIMELINE = "timeline"
+FOLLOW_FEED_HYBRID = "hybrid"
+FOLLOW_FEED_MERGE = "merge"
+TIMELINE_BATCH_SIZE = 1000
+TIMELINE_BACKFILL_LIMIT = 200
+PULLED_AUTHORS_CACHE_TIMEOUT = 60 * 5
+RECENT_POSTS_LIMIT = 200
+RECENT_POSTS_CACHE_TIMEOUT = 60 * 60
+FOLLOWEES_CACHE_TIMEOUT = 60 * 60
+FEED_GENERATION = "feed"
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 6
+COMMENTS_GENERATION = "comments"
+COUNTERS_BATCH_SIZE = 1000
+FOLLOW_BATCH_SIZE = 500
+COMMENTS_PER_PAGE = 20
+SEARCH_SNIPPET_TOKENS = 24
+LOOKUP_GENERATION = "lookup"
+LOOKUP_CACHE_TIMEOUT = 60 * 60
+LOOKUP_MIN_QUERY_LENGTH = 2
+LOOKUP_RESULTS_LIMIT = 10
+LOOKUP_CANDIDATES_LIMIT = 50
+LOOKUP_MIN_SIMILARITY = 0.3
+LOOKUP_BATCH_SIZE = 500
+TAG_MAX_LENGTH = 50
+POST_THUMBNAILS = (
+    ("960x339", {"crop": "center", "upscale": True}),
+)
+THUMBNAIL_QUEUED_TIMEOUT = 60 * 5
+IMAGE_VARIANT_WIDTHS = (320, 640, 960)
+IMAGE_VARIANT_RATIO = (960, 339)
+IMAGE_VARIANT_FORMATS = (
+    ("AVIF", "image/avif", "avif", {"quality": 50}),
+    ("WEBP", "image/webp", "webp", {"quality": 75, "method": 4}),
+    ("JPEG", "image/jpeg", "jpg", {"quality": 80, "optimize": True}),
+)
+IMAGE_VARIANT_SIZES = "(max-width: 960px) 100vw, 960px"
+IMAGE_VARIANT_BATCH_SIZE = 100
+IMAGE_INGEST_METADATA = (
+    "exif", "xmp", "XML:com.adobe.xmp", "comment", "photoshop",
+)
+IMAGE_INGEST_SAVE_OPTIONS = {
+    "JPEG": {"quality": 90, "optimize": True},
+    "PNG": {"optimize": True},
+    "WEBP": {"quality": 90},
+}
+MEDIA_SHARD_WIDTH = 2
+MEDIA_SHARD_DEPTH = 2
+MEDIA_BATCH_SIZE = 500
+MEDIA_GC_GRACE = 60 * 60
+MEDIA_DELETE_GRACE = 60
@@ -0,0 +1,118 @@
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .constants import COUNTERS_BATCH_SIZE
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+def _increment(queryset, **deltas):
+    return queryset.update(**{
+        field: Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+    })
+
+
+def _counts(queryset, field, ids):
+    return dict(
+        queryset.filter(**{f"{field}__in": ids}).order_by().values_list(
+            field
+        ).annotate(Count("pk"))
+    )
+
+
+def _batches(queryset, batch_size):
+    last_pk = 0
+    while True:
+        ids = list(
+            queryset.filter(pk__gt=last_pk).order_by("pk").values_list(
+                "pk", flat=True
+            )[:batch_size]
+        )
+        if not ids:
+            return
+        yield ids
+        last_pk = ids[-1]
+
+
+def recount_users_stats(users_ids):
+    posts = _counts(Post.objects, "author_id", users_ids)
+    followers = _counts(Follow.objects, "author_id", users_ids)
+    following = _counts(Follow.objects, "user_id", users_ids)
+    stats = [
+        UserStats(
+            user_id=user_id,
+            posts_count=posts.get(user_id, 0),
+            followers_count=followers.get(user_id, 0),
+            following_count=following.get(user_id, 0),
+        )
+        for user_id in users_ids
+    ]
+    with transaction.atomic():
+        UserStats.objects.bulk_create(stats, ignore_conflicts=True)
+        UserStats.objects.bulk_update(
+            stats, ("posts_count", "followers_count", "following_count")
+        )
+
+
+def recount_groups(groups_ids):
+    posts = _counts(Post.objects, "group_id", groups_ids)
+    Group.objects.bulk_update(
+        [
+            Group(pk=group_id, posts_count=posts.get(group_id, 0))
+            for group_id in groups_ids
+        ],
+        ("posts_count",),
+    )
+
+
+def recount_posts(posts_ids):
+    comments = _counts(Comment.objects, "post_id", posts_ids)
+    Post.objects.bulk_update(
+        [
+            Post(pk=post_id, comments_count=comments.get(post_id, 0))
+            for post_id in posts_ids
+        ],
+        ("comments_count",),
+    )
+
+
+def repair_counters(batch_size=COUNTERS_BATCH_SIZE):
+    processed = {}
+    for model, recount in (
+        (User, recount_users_stats),
+        (Group, recount_groups),
+        (Post, recount_posts),
+    ):
+        processed[model._meta.verbose_name_plural] = 0
+        for ids in _batches(model.objects.all(), batch_size):
+            with transaction.atomic():
+                recount(ids)
+            processed[model._meta.verbose_name_plural] += len(ids)
+    return processed
+
+
+def get_user_stats(user):
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        # Строку создаст repair_counters, на чтении только считаем.
+        return UserStats(
+            user=user,
+            posts_count=Post.objects.filter(author=user).count(),
+            followers_count=Follow.objects.filter(author=user).count(),
+            following_count=Follow.objects.filter(user=user).count(),
+        )
+
+
+def change_user_stats(user_id, **deltas):
+    _increment(UserStats.objects.filter(user_id=user_id), **deltas)
+
+
+def change_group_posts(group_id, delta):
+    if group_id is not None:
+        _increment(Group.objects.filter(pk=group_id), posts_count=delta)
+
+
+def change_post_comments(post_id, delta):
+    _increment(Post.objects.filter(pk=post_id), comments_count=delta)
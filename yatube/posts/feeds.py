@@ -0,0 +1,267 @@
+import copy
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .caching import cached_count
+from .constants import (
+    FOLLOW_FEED_HYBRID, FOLLOW_FEED_MERGE, FOLLOW_FEED_TIMELINE,
+    FOLLOWEES_CACHE_TIMEOUT, POST_PER_PAGE, RECENT_POSTS_CACHE_TIMEOUT,
+    RECENT_POSTS_LIMIT,
+)
+from .models import Follow, Post
+from .timelines import pulled_authors, record_metric
+from .utils import create_pagination
+
+
+class JoinedFeed:
+    """Посты, отобранные через связанную модель со своей копией даты.
+
+    Поддерживает срезы, count(), order_by() и filter(), поэтому с ней
+    работают все пагинаторы из create_pagination. Сортировка и условия
+    переводятся на поля связанной модели по related_fields, чтобы запрос
+    шел по ее индексу, а не по дате поста.
+    """
+    model = Post
+    ordered = True
+    related_fields = {}
+
+    def __init__(self, fields=("-pub_date", "-pk"), condition=Q()):
+        self.fields = fields
+        self.condition = condition
+        self.descending = fields[0].startswith("-")
+
+    def _related_lookup(self, lookup):
+        prefix = "-" if lookup.startswith("-") else ""
+        field, _, rest = lookup.lstrip("-").partition("__")
+        return prefix + "__".join(
+            filter(None, (self.related_fields[field], rest))
+        )
+
+    def _related_condition(self, condition):
+        translated = copy.copy(condition)
+        translated.children = [
+            self._related_condition(child) if isinstance(child, Q)
+            else (self._related_lookup(child[0]), child[1])
+            for child in condition.children
+        ]
+        return translated
+
+    def _joined(self, queryset, **lookups):
+        # Условия и сортировка в одном filter() используют одно соединение
+        # со связанной моделью.
+        return queryset.filter(
+            Q(**lookups) & self._related_condition(self.condition)
+        ).select_related("author", "group").order_by(
+            *map(self._related_lookup, self.fields)
+        )
+
+    def order_by(self, *fields):
+        feed = copy.copy(self)
+        feed.fields = fields
+        feed.descending = fields[0].startswith("-")
+        return feed
+
+    def filter(self, *args, **kwargs):
+        feed = copy.copy(self)
+        feed.condition = self.condition & Q(*args, **kwargs)
+        return feed
+
+
+class TagFeed(JoinedFeed):
+    """Посты тега в порядке индекса post_tag_pub_date_idx."""
+    related_fields = {
+        "pub_date": "post_tags__pub_date",
+        "pk": "post_tags__post__pk",
+    }
+
+    def __init__(self, tag, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tag = tag
+
+    @property
+    def posts(self):
+        return self._joined(Post.objects.all(), post_tags__tag=self.tag)
+
+    def count(self):
+        return cached_count(self.posts)
+
+    def __getitem__(self, index):
+        return self.posts[index]
+
+
+class HybridFeed(JoinedFeed):
+    """Лента из постов, разосланных по подпискам, и постов популярных
+    авторов, которые подтягиваются при чтении.
+
+    Разосланные посты сортируются и фильтруются по полям записей ленты,
+    чтобы запрос шел по индексу timeline_user_pub_date_idx.
+    """
+    related_fields = {
+        "pub_date": "timeline_entries__pub_date",
+        "pk": "timeline_entries__post__pk",
+    }
+
+    def __init__(self, user_id, pulled_ids, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user_id = user_id
+        self.pulled_ids = pulled_ids
+
+    @property
+    def pushed_posts(self):
+        return self._joined(
+            Post.objects.exclude(author_id__in=self.pulled_ids),
+            timeline_entries__user_id=self.user_id,
+        )
+
+    @property
+    def pulled_posts(self):
+        return Post.objects.filter(
+            self.condition,
+            author__following__user_id=self.user_id,
+            author_id__in=self.pulled_ids,
+        ).select_related("author", "group").order_by(*self.fields)
+
+    def count(self):
+        return self.pushed_posts.count() + self.pulled_posts.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        pulled = list(self.pulled_posts[:index.stop])
+        posts = list(islice(
+            heapq.merge(
+                self.pushed_posts[:index.stop],
+                pulled,
+                key=lambda post: (post.pub_date, post.pk),
+                reverse=self.descending,
+            ),
+            index.start,
+            index.stop,
+        ))
+        pulled = {post.pk for post in pulled}
+        record_metric(
+            "pulled", sum(post.pk in pulled for post in posts)
+        )
+        return posts
+
+
+class MergeFeed:
+    """Лента подписок, собранная слиянием закэшированных списков последних
+    постов каждого автора без сортировки на стороне базы.
+
+    Страницы глубже RECENT_POSTS_LIMIT и курсорная пагинация берутся из
+    обычного запроса к базе.
+    """
+    model = Post
+    ordered = True
+
+    def __init__(self, user_id):
+        self.authors_ids = get_followees_ids(user_id)
+        self.queryset = Post.objects.filter(
+            author_id__in=self.authors_ids
+        ).select_related("author", "group").order_by("-pub_date", "-pk")
+
+    def order_by(self, *fields):
+        return self.queryset.order_by(*fields)
+
+    def filter(self, *args, **kwargs):
+        return self.queryset.filter(*args, **kwargs)
+
+    def count(self):
+        return cached_count(self.queryset)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if index.stop is None or index.stop > RECENT_POSTS_LIMIT:
+            return list(self.queryset[index])
+        posts_ids = [
+            post_id for _, post_id in islice(
+                heapq.merge(
+                    *get_recent_posts(self.authors_ids).values(),
+                    reverse=True,
+                ),
+                index.start,
+                index.stop,
+            )
+        ]
+        posts = self.queryset.in_bulk(posts_ids)
+        return [posts[pk] for pk in posts_ids if pk in posts]
+
+
+def get_followees_ids(user_id):
+    key = f"followees:{user_id}"
+    authors_ids = cache.get(key)
+    if authors_ids is None:
+        authors_ids = sorted(set(Follow.objects.filter(
+            user_id=user_id
+        ).values_list("author_id", flat=True)))
+        cache.set(key, authors_ids, FOLLOWEES_CACHE_TIMEOUT)
+    return authors_ids
+
+
+def invalidate_followees(user_id):
+    cache.delete(f"followees:{user_id}")
+
+
+def get_recent_posts(authors_ids):
+    keys = {f"recent_posts:{author_id}": author_id
+            for author_id in authors_ids}
+    recent_posts = {
+        keys[key]: value for key, value in cache.get_many(keys).items()
+    }
+    missing = {}
+    for author_id in set(authors_ids) - set(recent_posts):
+        recent_posts[author_id] = list(
+            Post.objects.filter(author_id=author_id).order_by(
+                "-pub_date", "-pk"
+            ).values_list("pub_date", "id")[:RECENT_POSTS_LIMIT]
+        )
+        missing[f"recent_posts:{author_id}"] = recent_posts[author_id]
+    cache.set_many(missing, RECENT_POSTS_CACHE_TIMEOUT)
+    return recent_posts
+
+
+def invalidate_recent_posts(author_id):
+    cache.delete(f"recent_posts:{author_id}")
+
+
+def hybrid_feed(user):
+    return HybridFeed(user.pk, pulled_authors())
+
+
+def get_follow_page(user, page):
+    if settings.POSTS_FOLLOW_FEED == FOLLOW_FEED_MERGE:
+        return create_pagination(
+            MergeFeed(user.id),
+            POST_PER_PAGE,
+            page,
+            feed="follow_index",
+        )
+    if settings.POSTS_FOLLOW_FEED == FOLLOW_FEED_HYBRID:
+        return create_pagination(
+            hybrid_feed(user),
+            POST_PER_PAGE,
+            page,
+            feed="follow_index",
+        )
+    if settings.POSTS_FOLLOW_FEED == FOLLOW_FEED_TIMELINE:
+        # Без подтягиваемых авторов все посты читаются из ленты.
+        return create_pagination(
+            HybridFeed(user.pk, ()),
+            POST_PER_PAGE,
+            page,
+            feed="follow_index",
+        )
+    return create_pagination(
+        Post.objects.filter(
+            author__following__user=user,
+        ).select_related("author", "group"),
+        POST_PER_PAGE,
+        page,
+        feed="follow_index",
+    )
@@ -0,0 +1,108 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+
+from .caching import touch_generation
+from .conditional import followers_generation, follows_generation
+from .constants import FOLLOW_BATCH_SIZE
+from .counters import recount_users_stats
+from .feeds import invalidate_followees
+from .models import Follow, User
+from .timelines import (
+    backfill_timeline, prune_timeline, timelines_enabled,
+    update_author_delivery,
+)
+
+
+def _group_by_user(pairs):
+    authors = defaultdict(set)
+    for user_id, author_id in pairs:
+        if user_id != author_id:
+            authors[user_id].add(author_id)
+    return authors
+
+
+def _slices(values, size):
+    values = sorted(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _recount(changed, batch_size=FOLLOW_BATCH_SIZE):
+    authors_ids = set().union(*changed.values())
+    for chunk in _slices(set(changed) | authors_ids, batch_size):
+        recount_users_stats(chunk)
+    for author_id in authors_ids:
+        update_author_delivery(author_id)
+    for username in User.objects.filter(pk__in=authors_ids).values_list(
+        "username", flat=True
+    ):
+        touch_generation(followers_generation(username))
+
+
+def follow(user, author):
+    if user.pk == author.pk:
+        return False
+    try:
+        with transaction.atomic():
+            Follow.objects.create(user=user, author=author)
+    except IntegrityError:
+        return False
+    return True
+
+
+def unfollow(user, author):
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+    return bool(deleted)
+
+
+def bulk_follow(pairs, batch_size=FOLLOW_BATCH_SIZE):
+    created = defaultdict(set)
+    with transaction.atomic():
+        for user_id, authors_ids in _group_by_user(pairs).items():
+            for chunk in _slices(authors_ids, batch_size):
+                new_authors = set(chunk) - set(
+                    Follow.objects.filter(
+                        user_id=user_id, author_id__in=chunk
+                    ).values_list("author_id", flat=True)
+                )
+                Follow.objects.bulk_create(
+                    (
+                        Follow(user_id=user_id, author_id=author_id)
+                        for author_id in new_authors
+                    ),
+                    ignore_conflicts=True,
+                )
+                created[user_id] |= new_authors
+        _recount(created)
+    # bulk_create не отправляет post_save: то же, что делают сигналы.
+    for user_id, authors_ids in created.items():
+        touch_generation(follows_generation(user_id))
+        invalidate_followees(user_id)
+        if timelines_enabled():
+            for author_id in authors_ids:
+                backfill_timeline(user_id, author_id)
+    return sum(len(authors_ids) for authors_ids in created.values())
+
+
+def bulk_unfollow(pairs, batch_size=FOLLOW_BATCH_SIZE):
+    deleted = defaultdict(set)
+    with transaction.atomic():
+        for user_id, authors_ids in _group_by_user(pairs).items():
+            for chunk in _slices(authors_ids, batch_size):
+                queryset = Follow.objects.filter(
+                    user_id=user_id, author_id__in=chunk
+                )
+                existing = set(queryset.values_list("author_id", flat=True))
+                if existing:
+                    queryset._raw_delete(queryset.db)
+                    deleted[user_id] |= existing
+        _recount(deleted)
+    # Удаление без post_delete: то же, что делают сигналы, по пачкам.
+    for user_id, authors_ids in deleted.items():
+        touch_generation(follows_generation(user_id))
+        invalidate_followees(user_id)
+        if timelines_enabled():
+            prune_timeline(user_id, authors_ids)
+    return sum(len(authors_ids) for authors_ids in deleted.values())
@@ -1,9 +1,31 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
 
+from .ingest import check_image_size, ingest_image
 from .models import Comment, Post
 
 
 class PostForm(forms.ModelForm):
+    def clean_image(self):
+        image = self.cleaned_data.get("image")
+        if isinstance(image, UploadedFile):
+            return ingest_image(image)
+        return image
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = self.files.get(self.add_prefix("image"))
+        if upload is not None:
+            try:
+                check_image_size(upload)
+            except ValidationError as error:
+                # Обработчик загрузки обрезает файл по лимиту размера,
+                # поэтому ошибка декодирования обрезанного файла неверна.
+                self.errors.pop("image", None)
+                self.add_error("image", error)
+        return cleaned_data
+
     class Meta:
         model = Post
 
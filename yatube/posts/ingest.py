@@ -0,0 +1,115 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image, ImageOps, ImageSequence
+
+from .constants import IMAGE_INGEST_METADATA, IMAGE_INGEST_SAVE_OPTIONS
+
+
+class BoundedUploadHandler(TemporaryFileUploadHandler):
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.POSTS_IMAGE_MAX_BYTES:
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+
+def _needs_rewrite(image):
+    return max(image.size) > settings.POSTS_IMAGE_MAX_SIDE or any(
+        key in image.info for key in IMAGE_INGEST_METADATA
+    )
+
+
+def _downscale(image):
+    max_side = settings.POSTS_IMAGE_MAX_SIDE
+    # thumbnail() декодирует JPEG в режиме draft и сначала уменьшает его
+    # в целое число раз, поэтому картинка целиком в память не попадает.
+    image.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=2.0)
+    image = ImageOps.exif_transpose(image)
+    # Кодеки вроде GIF сами переносят метаданные из info в новый файл.
+    for key in IMAGE_INGEST_METADATA:
+        image.info.pop(key, None)
+    return image
+
+
+def _downscale_frames(image):
+    frames = [
+        _downscale(frame.copy()) for frame in ImageSequence.Iterator(image)
+    ]
+    return frames[0], {
+        "save_all": True,
+        "append_images": frames[1:],
+        "duration": [frame.info.get("duration", 0) for frame in frames],
+        "loop": image.info.get("loop", 0),
+    }
+
+
+def _save_options(image, image_format):
+    options = dict(IMAGE_INGEST_SAVE_OPTIONS.get(image_format, {}))
+    for key in ("icc_profile", "transparency"):
+        if key in image.info:
+            options[key] = image.info[key]
+    return options
+
+
+def check_image_size(uploaded):
+    if uploaded.size > settings.POSTS_IMAGE_MAX_BYTES:
+        raise ValidationError(
+            "Размер файла не должен превышать %(limit)s байт",
+            code="image_too_large",
+            params={"limit": settings.POSTS_IMAGE_MAX_BYTES},
+        )
+
+
+def ingest_image(uploaded):
+    check_image_size(uploaded)
+    uploaded.seek(0)
+    try:
+        image = Image.open(uploaded)
+    except Image.DecompressionBombError:
+        image = None
+    if image is None or (
+        image.width * image.height > settings.POSTS_IMAGE_MAX_PIXELS
+    ):
+        raise ValidationError(
+            "Картинка не должна содержать больше %(limit)s пикселей",
+            code="image_too_many_pixels",
+            params={"limit": settings.POSTS_IMAGE_MAX_PIXELS},
+        )
+    with image:
+        # В MPO за первым кадром идут дополнительные снимки со своими
+        # метаданными, поэтому сохраняется только первый кадр как JPEG.
+        is_mpo = image.format == "MPO"
+        image_format = "JPEG" if is_mpo else image.format
+        if not is_mpo and not _needs_rewrite(image):
+            uploaded.seek(0)
+            return uploaded
+        if getattr(image, "is_animated", False) and not is_mpo:
+            image, options = _downscale_frames(image)
+        else:
+            image, options = _downscale(image), {}
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        options.update(_save_options(image, image_format))
+        output = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        image.save(output, image_format, **options)
+    size = output.tell()
+    output.seek(0)
+    return UploadedFile(
+        output,
+        os.path.basename(uploaded.name),
+        uploaded.content_type,
+        size,
+        uploaded.charset,
+        uploaded.content_type_extra,
+    )
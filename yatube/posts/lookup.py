@@ -0,0 +1,166 @@
+import hashlib
+import re
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.urls import reverse
+
+from .caching import bump_generation, get_generation
+from .constants import (
+    LOOKUP_BATCH_SIZE, LOOKUP_CACHE_TIMEOUT, LOOKUP_CANDIDATES_LIMIT,
+    LOOKUP_GENERATION, LOOKUP_MIN_QUERY_LENGTH, LOOKUP_MIN_SIMILARITY,
+    LOOKUP_RESULTS_LIMIT,
+)
+from .models import Group, NameTrigram, User
+
+
+def normalize(text):
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def trigrams(text):
+    result = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        result.update(
+            padded[i:i + 3] for i in range(len(padded) - 2)
+        )
+    return result
+
+
+def user_names(user):
+    return " ".join(
+        filter(None, (user.username, user.first_name, user.last_name))
+    )
+
+
+def _rows(kind, object_id, name):
+    return [
+        NameTrigram(trigram=trigram, kind=kind, object_id=object_id)
+        for trigram in trigrams(name)
+    ]
+
+
+def _replace(kind, names):
+    with transaction.atomic():
+        NameTrigram.objects.filter(
+            kind=kind, object_id__in=list(names)
+        ).delete()
+        NameTrigram.objects.bulk_create(
+            row
+            for object_id, name in names.items()
+            for row in _rows(kind, object_id, name)
+        )
+
+
+def index_user(user):
+    _replace(NameTrigram.KIND_USER, {user.pk: user_names(user)})
+    bump_generation(LOOKUP_GENERATION)
+
+
+def index_group(group):
+    _replace(NameTrigram.KIND_GROUP, {group.pk: group.title})
+    bump_generation(LOOKUP_GENERATION)
+
+
+def remove_from_index(kind, object_id):
+    NameTrigram.objects.filter(kind=kind, object_id=object_id).delete()
+    bump_generation(LOOKUP_GENERATION)
+
+
+def _reindex(kind, queryset, name, batch_size):
+    names = {}
+    for obj in queryset.order_by("pk").iterator(chunk_size=batch_size):
+        names[obj.pk] = name(obj)
+        if len(names) == batch_size:
+            _replace(kind, names)
+            names = {}
+    if names:
+        _replace(kind, names)
+
+
+def rebuild_lookup_index(batch_size=LOOKUP_BATCH_SIZE):
+    with transaction.atomic():
+        NameTrigram.objects.all().delete()
+        _reindex(
+            NameTrigram.KIND_USER,
+            User.objects.only("username", "first_name", "last_name"),
+            user_names,
+            batch_size,
+        )
+        _reindex(
+            NameTrigram.KIND_GROUP,
+            Group.objects.only("title"),
+            lambda group: group.title,
+            batch_size,
+        )
+    bump_generation(LOOKUP_GENERATION)
+    return NameTrigram.objects.count()
+
+
+def _similarity(query_trigrams, name):
+    best = 0
+    for part in (name, *normalize(name).split()):
+        part_trigrams = trigrams(part)
+        common = len(query_trigrams & part_trigrams)
+        best = max(best, common / len(query_trigrams | part_trigrams))
+    return best
+
+
+def _candidates(query_trigrams):
+    rows = NameTrigram.objects.filter(
+        trigram__in=query_trigrams
+    ).values_list("kind", "object_id").annotate(
+        hits=Count("id")
+    ).order_by("-hits")[:LOOKUP_CANDIDATES_LIMIT]
+    ids = {NameTrigram.KIND_USER: [], NameTrigram.KIND_GROUP: []}
+    for kind, object_id, hits in rows:
+        ids[kind].append(object_id)
+    users = User.objects.only(
+        "username", "first_name", "last_name"
+    ).in_bulk(ids[NameTrigram.KIND_USER])
+    groups = Group.objects.only(
+        "title", "slug"
+    ).in_bulk(ids[NameTrigram.KIND_GROUP])
+    for user in users.values():
+        yield user_names(user), {
+            "kind": NameTrigram.KIND_USER,
+            "label": user.get_full_name() or user.username,
+            "username": user.username,
+            "url": reverse("posts:profile", args=(user.username,)),
+        }
+    for group in groups.values():
+        yield group.title, {
+            "kind": NameTrigram.KIND_GROUP,
+            "label": group.title,
+            "slug": group.slug,
+            "url": reverse("posts:group_list", args=(group.slug,)),
+        }
+
+
+def _lookup(query):
+    query_trigrams = trigrams(query)
+    scored = []
+    for name, result in _candidates(query_trigrams):
+        prefix = f" {query}" in f" {normalize(name)}"
+        similarity = _similarity(query_trigrams, name)
+        if prefix or similarity >= LOOKUP_MIN_SIMILARITY:
+            scored.append((prefix, similarity, result["label"], result))
+    scored.sort(key=lambda item: (-item[0], -item[1], item[2]))
+    return [result for *_, result in scored[:LOOKUP_RESULTS_LIMIT]]
+
+
+def autocomplete(query):
+    query = normalize(query)
+    if len(query) < LOOKUP_MIN_QUERY_LENGTH:
+        return []
+    key = "lookup:{}:{}".format(
+        get_generation(LOOKUP_GENERATION),
+        hashlib.md5(query.encode()).hexdigest(),
+    )
+    results = cache.get(key)
+    if results is None:
+        results = _lookup(query)
+        cache.set(key, results, LOOKUP_CACHE_TIMEOUT)
+    return results
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.timelines import get_feed_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Показывает, сколько записей лент подписок разослано при публикации "
+        "и сколько подтянуто при чтении"
+    )
+
+    def handle(self, *args, **options):
+        for name, value in get_feed_metrics().items():
+            self.stdout.write(f"{name}: {value}")
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from posts.constants import MEDIA_BATCH_SIZE, MEDIA_GC_GRACE
+from posts.media_gc import (
+    collect_orphan_files, collect_stale_thumbnails, collect_stale_variants,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Находит и удаляет файлы медиа, на которые не ссылаются посты, "
+        "и устаревшие записи миниатюр sorl-thumbnail"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Удалять найденное; без флага только выводится отчет",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=MEDIA_BATCH_SIZE,
+            help="Количество файлов и записей, проверяемых за один запрос",
+        )
+        parser.add_argument(
+            "--grace",
+            type=int,
+            default=MEDIA_GC_GRACE,
+            help="Не трогать файлы, измененные за последние N секунд",
+        )
+
+    def handle(self, *args, **options):
+        report = None
+        if options["verbosity"] > 1:
+            report = self.stdout.write
+        params = {
+            "batch_size": options["batch_size"],
+            "delete": options["delete"],
+            "report": report,
+        }
+        entries = collect_stale_thumbnails(**params)
+        variants = collect_stale_variants(**params)
+        files = collect_orphan_files(grace=options["grace"], **params)
+        action = "Удалено" if options["delete"] else "Найдено"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action}: записей миниатюр {entries['stale_entries']} "
+            f"из {entries['entries']}, "
+            f"картинок с вариантами {variants['stale_sources']} "
+            f"из {variants['sources']}, "
+            f"файлов {files['orphans']} из {files['files']} "
+            f"({files['orphan_bytes']} байт)"
+        ))
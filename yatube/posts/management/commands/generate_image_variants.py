@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.constants import IMAGE_VARIANT_BATCH_SIZE
+from posts.variants import generate_variants, sources_without_variants
+
+
+class Command(BaseCommand):
+    help = "Создает адаптивные варианты картинок постов, у которых их нет"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMAGE_VARIANT_BATCH_SIZE,
+            help="Количество картинок, выбираемых из базы за один раз",
+        )
+
+    def handle(self, *args, **options):
+        count = 0
+        for source in sources_without_variants(options["batch_size"]):
+            generate_variants(source)
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Созданы варианты для картинок: {count}")
+        )
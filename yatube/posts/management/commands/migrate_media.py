@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from posts.constants import MEDIA_BATCH_SIZE
+from posts.media import migrate_post_images, recount_references
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит картинки постов в хранилище с адресацией по содержимому "
+        "и пересчитывает ссылки на файлы"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=MEDIA_BATCH_SIZE,
+            help="Количество имен файлов, выбираемых из базы за один раз",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать, сколько файлов будет перенесено",
+        )
+
+    def handle(self, *args, **options):
+        migrated, missing = migrate_post_images(
+            options["batch_size"], options["dry_run"]
+        )
+        if not options["dry_run"]:
+            recount_references(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Перенесено файлов: {migrated}, не найдено: {missing}"
+        ))
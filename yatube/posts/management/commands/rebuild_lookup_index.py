@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.constants import LOOKUP_BATCH_SIZE
+from posts.lookup import rebuild_lookup_index
+
+
+class Command(BaseCommand):
+    help = "Пересобирает триграммный индекс имен пользователей и групп"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=LOOKUP_BATCH_SIZE,
+            help="Количество объектов, индексируемых за один раз",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_lookup_index(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Индекс имен пересобран, триграмм: {count}")
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.constants import TIMELINE_BATCH_SIZE
+from posts.timelines import rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = "Пересобирает ленты подписок всех пользователей с нуля"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=TIMELINE_BATCH_SIZE,
+            help="Количество записей ленты в одной вставке",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_timelines(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Ленты пересобраны, записей: {count}")
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.constants import COUNTERS_BATCH_SIZE
+from posts.counters import repair_counters
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает денормализованные счетчики постов и подписок"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=COUNTERS_BATCH_SIZE,
+            help="Количество объектов, пересчитываемых в одной транзакции",
+        )
+
+    def handle(self, *args, **options):
+        for name, count in repair_counters(options["batch_size"]).items():
+            self.stdout.write(
+                self.style.SUCCESS(f"{name}: пересчитано {count}")
+            )
@@ -0,0 +1,154 @@
+import os
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .caching import touch_generation
+from .constants import (
+    FEED_GENERATION, MEDIA_BATCH_SIZE, MEDIA_DELETE_GRACE,
+)
+from .models import Post, StoredFile
+from .storage import post_image_storage
+from .thumbnails import (
+    generate_thumbnails, invalidate_thumbnails, schedule, submit,
+)
+from .variants import delete_variants, generate_variants
+
+
+def acquire(name, count=1):
+    updated = StoredFile.objects.filter(name=name).update(
+        references=F("references") + count
+    )
+    if updated:
+        return False
+    try:
+        with transaction.atomic():
+            StoredFile.objects.create(name=name, references=count)
+    except IntegrityError:
+        return acquire(name, count)
+    return True
+
+
+def is_referenced(name):
+    return (
+        StoredFile.objects.filter(name=name, references__gt=0).exists()
+        or Post.objects.filter(image=name).exists()
+    )
+
+
+def release(name):
+    StoredFile.objects.filter(name=name, references__gt=0).update(
+        references=F("references") - 1
+    )
+    StoredFile.objects.filter(name=name, references=0).delete()
+    return not is_referenced(name)
+
+
+def generate_derived(name):
+    generate_thumbnails(name)
+    generate_variants(name)
+
+
+def _recently_saved(name):
+    try:
+        mtime = os.path.getmtime(post_image_storage.path(name))
+    except FileNotFoundError:
+        return False
+    return time.time() - mtime < MEDIA_DELETE_GRACE
+
+
+def delete_unreferenced(name):
+    if is_referenced(name):
+        return
+    with transaction.atomic():
+        # Строка блокирует acquire() того же файла до конца удаления.
+        stored_file, _ = StoredFile.objects.select_for_update().get_or_create(
+            name=name
+        )
+        # Повторная загрузка того же файла обновляет mtime, а ссылка на
+        # него появится только с коммитом нового поста. На SQLite строка
+        # не блокируется, поэтому свежий файл оставляем сборщику мусора.
+        if is_referenced(name) or _recently_saved(name):
+            return
+        invalidate_thumbnails(name)
+        delete_variants(name)
+        post_image_storage.delete(name)
+        stored_file.delete()
+
+
+def update_post_image(previous_name, name):
+    if previous_name == name:
+        return
+    if name and acquire(name):
+        schedule(generate_derived, name)
+    if previous_name and release(previous_name):
+        schedule(delete_unreferenced, previous_name)
+
+
+def _legacy_names(batch_size):
+    last_name = ""
+    while True:
+        names = list(
+            Post.objects.filter(image__gt=last_name).order_by(
+                "image"
+            ).values_list("image", flat=True).distinct()[:batch_size]
+        )
+        if not names:
+            return
+        last_name = names[-1]
+        for name in names:
+            if not post_image_storage.is_content_addressed(name):
+                yield name
+
+
+def _delete_legacy(names):
+    # Update() обходит сигналы, а кэшированные страницы еще ссылаются на
+    # старые файлы: сначала сбрасываем их, потом удаляем файлы.
+    touch_generation(FEED_GENERATION)
+    for name in names:
+        invalidate_thumbnails(name)
+        delete_variants(name)
+        post_image_storage.delete(name)
+
+
+def migrate_post_images(batch_size=MEDIA_BATCH_SIZE, dry_run=False):
+    migrated = missing = 0
+    migrated_names = []
+    for name in _legacy_names(batch_size):
+        if not post_image_storage.exists(name):
+            missing += 1
+            continue
+        migrated += 1
+        if dry_run:
+            continue
+        with post_image_storage.open(name) as file:
+            new_name = post_image_storage.save(name, file)
+        with transaction.atomic():
+            count = Post.objects.filter(image=name).update(image=new_name)
+            created = acquire(new_name, count)
+        if created:
+            submit(generate_derived, new_name)
+        migrated_names.append(name)
+        if len(migrated_names) >= batch_size:
+            _delete_legacy(migrated_names)
+            migrated_names = []
+    if migrated_names:
+        _delete_legacy(migrated_names)
+    return migrated, missing
+
+
+def recount_references(batch_size=MEDIA_BATCH_SIZE):
+    with transaction.atomic():
+        StoredFile.objects.all().delete()
+        StoredFile.objects.bulk_create(
+            (
+                StoredFile(name=name, references=references)
+                for name, references in Post.objects.exclude(
+                    image=""
+                ).exclude(image=None).order_by().values_list(
+                    "image"
+                ).annotate(references=Count("pk")).iterator()
+            ),
+            batch_size=batch_size,
+        )
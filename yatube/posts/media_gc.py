@@ -0,0 +1,173 @@
+import os
+import time
+from collections import Counter
+from itertools import islice
+
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore
+
+from .constants import MEDIA_BATCH_SIZE, MEDIA_GC_GRACE
+from .models import ImageVariant, Post, StoredFile
+from .sorl_compat import find_keys, kvstore_cache
+from .storage import post_image_storage
+from .thumbnails import get_many_raw
+from .variants import VARIANTS_DIR, delete_variants
+
+THUMBNAILS_DIR = sorl_settings.THUMBNAIL_PREFIX.strip("/")
+POSTS_DIR = Post._meta.get_field("image").upload_to.strip("/")
+
+
+def walk_files(root, directory):
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, current))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                name = f"{current}/{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(name)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    yield name, stat.st_size, stat.st_mtime
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _referenced_posts_images(names):
+    return set(
+        Post.objects.filter(image__in=names).values_list("image", flat=True)
+    )
+
+
+def _referenced_variants(names):
+    return set(
+        ImageVariant.objects.filter(file__in=names).values_list(
+            "file", flat=True
+        )
+    )
+
+
+def _referenced_thumbnails(names):
+    keys = {
+        add_prefix(ImageFile(name, default.storage).key): name
+        for name in names
+    }
+    return {keys[key] for key in get_many_raw(list(keys))}
+
+
+REFERENCE_FINDERS = {
+    POSTS_DIR: _referenced_posts_images,
+    VARIANTS_DIR: _referenced_variants,
+    THUMBNAILS_DIR: _referenced_thumbnails,
+}
+
+
+def collect_orphan_files(batch_size=MEDIA_BATCH_SIZE, grace=MEDIA_GC_GRACE,
+                         delete=False, report=None):
+    stats = Counter()
+    deadline = time.time() - grace
+    root = post_image_storage.location
+    for directory, find_referenced in REFERENCE_FINDERS.items():
+        for batch in _batches(walk_files(root, directory), batch_size):
+            stats["files"] += len(batch)
+            candidates = {
+                name: size for name, size, mtime in batch if mtime < deadline
+            }
+            referenced = find_referenced(list(candidates))
+            orphans = [name for name in candidates if name not in referenced]
+            for name in orphans:
+                stats["orphans"] += 1
+                stats["orphan_bytes"] += candidates[name]
+                if report:
+                    report(name)
+                if delete:
+                    post_image_storage.delete(name)
+            if delete and orphans and directory == POSTS_DIR:
+                StoredFile.objects.filter(name__in=orphans).delete()
+    return stats
+
+
+def _image_entries(batch_size):
+    if kvstore_cache() is None:
+        keys = (add_prefix(key) for key in find_keys(identity="image"))
+        for batch in _batches(keys, batch_size):
+            yield [
+                (key, value) for key, value in get_many_raw(batch).items()
+            ]
+        return
+    prefix = add_prefix("")
+    last_key = prefix
+    while True:
+        batch = list(
+            KVStore.objects.filter(
+                key__gt=last_key, key__startswith=prefix
+            ).order_by("key").values_list("key", "value")[:batch_size]
+        )
+        if not batch:
+            return
+        last_key = batch[-1][0]
+        yield batch
+
+
+def collect_stale_thumbnails(batch_size=MEDIA_BATCH_SIZE, delete=False,
+                             report=None):
+    stats = Counter()
+    for batch in _image_entries(batch_size):
+        images = [deserialize_image_file(value) for _, value in batch]
+        sources = _referenced_posts_images([
+            image.name for image in images
+            if not image.name.startswith(sorl_settings.THUMBNAIL_PREFIX)
+        ])
+        for image in images:
+            stats["entries"] += 1
+            if image.name.startswith(sorl_settings.THUMBNAIL_PREFIX):
+                stale = not image.exists()
+            else:
+                stale = image.name not in sources
+            if not stale:
+                continue
+            stats["stale_entries"] += 1
+            if report:
+                report(image.name)
+            if delete:
+                default.kvstore.delete(image)
+    return stats
+
+
+def collect_stale_variants(batch_size=MEDIA_BATCH_SIZE, delete=False,
+                           report=None):
+    stats = Counter()
+    last_source = ""
+    while True:
+        sources = list(
+            ImageVariant.objects.filter(source__gt=last_source).order_by(
+                "source"
+            ).values_list("source", flat=True).distinct()[:batch_size]
+        )
+        if not sources:
+            return stats
+        last_source = sources[-1]
+        referenced = _referenced_posts_images(sources)
+        for source in sources:
+            stats["sources"] += 1
+            if source in referenced:
+                continue
+            stats["stale_sources"] += 1
+            if report:
+                report(source)
+            if delete:
+                delete_variants(source)
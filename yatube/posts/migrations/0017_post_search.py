@@ -0,0 +1,65 @@
+from django.db import migrations
+
+# Копия SQL из posts.search на момент миграции: миграция не должна
+# зависеть от текущего кода приложения.
+SEARCH_INDEX_SQL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_search USING fts5(
+        text,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_post_search_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO posts_post_search(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_post_search_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO posts_post_search(posts_post_search, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_post_search_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO posts_post_search(posts_post_search, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO posts_post_search(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    "INSERT INTO posts_post_search(posts_post_search) VALUES ('rebuild')",
+)
+DROP_SEARCH_INDEX_SQL = (
+    "DROP TRIGGER IF EXISTS posts_post_search_insert",
+    "DROP TRIGGER IF EXISTS posts_post_search_delete",
+    "DROP TRIGGER IF EXISTS posts_post_search_update",
+    "DROP TABLE IF EXISTS posts_post_search",
+)
+
+
+def run_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        with schema_editor.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_unique_follow'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_sqlite(SEARCH_INDEX_SQL), run_sqlite(DROP_SEARCH_INDEX_SQL)
+        ),
+    ]
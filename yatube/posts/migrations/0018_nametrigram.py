@@ -0,0 +1,70 @@
+# Generated by Django 2.2.28 on 2026-10-18 05:13
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def trigrams(text):
+    # Копия posts.lookup.trigrams на момент миграции.
+    result = set()
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def fill_name_trigrams(apps, schema_editor):
+    NameTrigram = apps.get_model('posts', 'NameTrigram')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Group = apps.get_model('posts', 'Group')
+    names = [
+        ('user', user.pk, ' '.join(filter(None, (
+            user.username, user.first_name, user.last_name
+        ))))
+        for user in User.objects.iterator()
+    ]
+    names += [
+        ('group', group.pk, group.title) for group in Group.objects.iterator()
+    ]
+    NameTrigram.objects.bulk_create(
+        (
+            NameTrigram(trigram=trigram, kind=kind, object_id=object_id)
+            for kind, object_id, name in names
+            for trigram in trigrams(name)
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NameTrigram',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3, verbose_name='Триграмма')),
+                ('kind', models.CharField(choices=[('user', 'Пользователь'), ('group', 'Группа')], max_length=5, verbose_name='Тип объекта')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Идентификатор объекта')),
+            ],
+            options={
+                'verbose_name': 'Триграмма имени',
+                'verbose_name_plural': 'Триграммы имен',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='nametrigram',
+            index=models.Index(fields=['kind', 'object_id'], name='trigram_object_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='nametrigram',
+            constraint=models.UniqueConstraint(fields=('trigram', 'kind', 'object_id'), name='unique_name_trigram'),
+        ),
+        migrations.RunPython(fill_name_trigrams, migrations.RunPython.noop),
+    ]
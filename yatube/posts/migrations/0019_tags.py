@@ -0,0 +1,71 @@
+# Generated by Django 2.2.28 on 2026-10-18 05:14
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Копия posts.tags.HASHTAG_RE на момент миграции.
+HASHTAG_RE = re.compile(r"(?<![\w#&])#(\w{1,50})(?!\w)")
+
+
+def extract_tags(text):
+    return {name.lower() for name in HASHTAG_RE.findall(text)}
+
+
+def fill_post_tags(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Tag = apps.get_model('posts', 'Tag')
+    PostTag = apps.get_model('posts', 'PostTag')
+    tags = {}
+    for post in Post.objects.only('text', 'pub_date').iterator():
+        for name in extract_tags(post.text):
+            if name not in tags:
+                tags[name] = Tag.objects.create(name=name)
+            PostTag.objects.create(
+                tag=tags[name], post=post, pub_date=post.pub_date
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_nametrigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Название')),
+            ],
+            options={
+                'verbose_name': 'Тег',
+                'verbose_name_plural': 'Теги',
+                'ordering': ('name',),
+            },
+        ),
+        migrations.CreateModel(
+            name='PostTag',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='posts.Post', verbose_name='Пост')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='posts.Tag', verbose_name='Тег')),
+            ],
+            options={
+                'verbose_name': 'Тег поста',
+                'verbose_name_plural': 'Теги постов',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='posttag',
+            index=models.Index(fields=['tag', 'pub_date', 'post'], name='post_tag_pub_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='posttag',
+            constraint=models.UniqueConstraint(fields=('post', 'tag'), name='unique_post_tag'),
+        ),
+        migrations.RunPython(fill_post_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-18 05:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_content_addressed_media'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='imagevariant',
+            index=models.Index(fields=['file'], name='image_variant_file_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.28 on 2026-10-18 05:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_fanout_pulled(apps, schema_editor):
+    UserStats = apps.get_model('posts', 'UserStats')
+    UserStats.objects.filter(
+        followers_count__gt=settings.POSTS_FANOUT_FOLLOWERS_LIMIT
+    ).update(fanout_pulled=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0022_image_variant_file_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstats',
+            name='fanout_pulled',
+            field=models.BooleanField(default=False, help_text='Подписчиков больше лимита, посты не рассылаются по лентам', verbose_name='Посты подтягиваются при чтении'),
+        ),
+        migrations.AddIndex(
+            model_name='userstats',
+            index=models.Index(condition=models.Q(fanout_pulled=True), fields=['fanout_pulled'], name='userstats_pulled_idx'),
+        ),
+        migrations.RunPython(fill_fanout_pulled, migrations.RunPython.noop),
+    ]
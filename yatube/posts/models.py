@@ -1,12 +1,29 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
-from .constants import CHARS_LIMIT_COMMENT, CHARS_LIMIT_POST
+from .constants import CHARS_LIMIT_COMMENT, CHARS_LIMIT_POST, TAG_MAX_LENGTH
+from .storage import post_image_storage
 
 User = get_user_model()
 
 
-class Group(models.Model):
+class CountersModel(models.Model):
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and "update_fields" not in kwargs:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+
+class Group(CountersModel):
     description = models.TextField(
         verbose_name="Описание",
         help_text="Задайте описание для группы",
@@ -22,17 +39,27 @@ class Group(models.Model):
         verbose_name="Адрес",
         help_text="Короткий, уникальный адрес группы",
     )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество постов",
+    )
+
+    counter_fields = ("posts_count",)
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ("title",)
+        indexes = (
+            models.Index(fields=("title",), name="group_title_idx"),
+        )
         verbose_name = "Группа"
         verbose_name_plural = "Группы"
 
 
-class Post(models.Model):
+class Post(CountersModel):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -58,15 +85,41 @@ class Post(models.Model):
         verbose_name="Картинка",
         help_text="Добавьте изображение для поста",
         upload_to="posts/",
+        storage=post_image_storage,
         blank=True,
         null=True,
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество комментариев",
+    )
+
+    counter_fields = ("comments_count",)
 
     def __str__(self):
         return self.text[:CHARS_LIMIT_POST]
 
     class Meta:
         ordering = ("-pub_date",)
+        indexes = (
+            models.Index(
+                fields=("pub_date",),
+                name="post_pub_date_idx",
+            ),
+            models.Index(
+                fields=("author", "pub_date"),
+                name="post_author_pub_date_idx",
+            ),
+            models.Index(
+                fields=("group", "pub_date"),
+                name="post_group_pub_date_idx",
+            ),
+            models.Index(
+                fields=("image",),
+                name="post_image_idx",
+            ),
+        )
         default_related_name = "posts"
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
@@ -97,6 +150,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ("-created",)
+        indexes = (
+            models.Index(
+                fields=("post", "created"),
+                name="comment_post_created_idx",
+            ),
+        )
         default_related_name = "comments"
         verbose_name = "Коментарий"
         verbose_name_plural = "Коментарии"
@@ -120,5 +179,257 @@ class Follow(models.Model):
         return f"{self.user} подписан на {self.author}"
 
     class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "author"),
+                name="unique_follow",
+            ),
+        )
         verbose_name = "Подписка"
         verbose_name_plural = "Подписки"
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        verbose_name="Пользователь",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество постов",
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество подписчиков",
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество подписок",
+    )
+    fanout_pulled = models.BooleanField(
+        default=False,
+        verbose_name="Посты подтягиваются при чтении",
+        help_text="Подписчиков больше лимита, посты не рассылаются по лентам",
+    )
+
+    def __str__(self):
+        return f"Статистика {self.user}"
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=("fanout_pulled",),
+                name="userstats_pulled_idx",
+                condition=models.Q(fanout_pulled=True),
+            ),
+        )
+        verbose_name = "Статистика пользователя"
+        verbose_name_plural = "Статистика пользователей"
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name="Читатель",
+        on_delete=models.CASCADE,
+        related_name="timeline",
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name="Пост",
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name="Автор",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    pub_date = models.DateTimeField(
+        verbose_name="Дата публикации",
+    )
+
+    def __str__(self):
+        return f"{self.post} в ленте {self.user}"
+
+    class Meta:
+        ordering = ("-pub_date",)
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "post"),
+                name="unique_timeline_entry",
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=("user", "pub_date", "post"),
+                name="timeline_user_pub_date_idx",
+            ),
+            models.Index(
+                fields=("user", "author"),
+                name="timeline_user_author_idx",
+            ),
+        )
+        verbose_name = "Запись ленты"
+        verbose_name_plural = "Записи ленты"
+
+
+class NameTrigram(models.Model):
+    KIND_USER = "user"
+    KIND_GROUP = "group"
+    KIND_CHOICES = (
+        (KIND_USER, "Пользователь"),
+        (KIND_GROUP, "Группа"),
+    )
+
+    trigram = models.CharField(
+        max_length=3,
+        verbose_name="Триграмма",
+    )
+    kind = models.CharField(
+        max_length=5,
+        choices=KIND_CHOICES,
+        verbose_name="Тип объекта",
+    )
+    object_id = models.PositiveIntegerField(
+        verbose_name="Идентификатор объекта",
+    )
+
+    def __str__(self):
+        return f"{self.trigram} → {self.kind} {self.object_id}"
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=("trigram", "kind", "object_id"),
+                name="unique_name_trigram",
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=("kind", "object_id"),
+                name="trigram_object_idx",
+            ),
+        )
+        verbose_name = "Триграмма имени"
+        verbose_name_plural = "Триграммы имен"
+
+
+class Tag(models.Model):
+    name = models.CharField(
+        max_length=TAG_MAX_LENGTH,
+        unique=True,
+        verbose_name="Название",
+    )
+
+    def __str__(self):
+        return f"#{self.name}"
+
+    class Meta:
+        ordering = ("name",)
+        verbose_name = "Тег"
+        verbose_name_plural = "Теги"
+
+
+class PostTag(models.Model):
+    tag = models.ForeignKey(
+        Tag,
+        verbose_name="Тег",
+        on_delete=models.CASCADE,
+        related_name="post_tags",
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name="Пост",
+        on_delete=models.CASCADE,
+        related_name="post_tags",
+    )
+    pub_date = models.DateTimeField(
+        verbose_name="Дата публикации",
+    )
+
+    def __str__(self):
+        return f"{self.tag} у поста {self.post_id}"
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=("post", "tag"),
+                name="unique_post_tag",
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=("tag", "pub_date", "post"),
+                name="post_tag_pub_date_idx",
+            ),
+        )
+        verbose_name = "Тег поста"
+        verbose_name_plural = "Теги постов"
+
+
+class ImageVariant(models.Model):
+    source = models.CharField(
+        max_length=255,
+        verbose_name="Исходная картинка",
+    )
+    mime_type = models.CharField(
+        max_length=20,
+        verbose_name="Формат",
+    )
+    width = models.PositiveIntegerField(
+        verbose_name="Ширина",
+    )
+    height = models.PositiveIntegerField(
+        verbose_name="Высота",
+    )
+    file = models.CharField(
+        max_length=255,
+        verbose_name="Файл варианта",
+    )
+    size = models.PositiveIntegerField(
+        verbose_name="Размер в байтах",
+    )
+
+    def __str__(self):
+        return f"{self.source} {self.mime_type} {self.width}w"
+
+    class Meta:
+        ordering = ("source", "mime_type", "width")
+        constraints = (
+            models.UniqueConstraint(
+                fields=("source", "mime_type", "width"),
+                name="unique_image_variant",
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=("file",),
+                name="image_variant_file_idx",
+            ),
+        )
+        verbose_name = "Вариант картинки"
+        verbose_name_plural = "Варианты картинок"
+
+
+class StoredFile(models.Model):
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name="Файл",
+    )
+    references = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество ссылок",
+    )
+
+    def __str__(self):
+        return f"{self.name} ({self.references})"
+
+    class Meta:
+        verbose_name = "Файл хранилища"
+        verbose_name_plural = "Файлы хранилища"
@@ -0,0 +1,208 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import (
+    EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator,
+)
+from django.db.models import DateTimeField, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .caching import cached_count
+
+
+class CachedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return cached_count(self.object_list)
+
+
+class CountlessPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f"<Page {self.number}>"
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountlessPaginator(Paginator):
+    countless_mode = True
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def get_page(self, number):
+        try:
+            return self.page(number)
+        except InvalidPage:
+            return self.page(1)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+        return CountlessPage(
+            rows[:self.per_page],
+            number,
+            self,
+            has_next=len(rows) > self.per_page,
+        )
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, cursor=None,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = cursor or 1
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<Cursor page {self.number}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинация по ключу (ordering_field, pk) без OFFSET и COUNT(*).
+
+    Курсор - непрозрачный токен с позицией последнего показанного объекта
+    и направлением перехода, поэтому стоимость любой страницы одинакова.
+    """
+    cursor_mode = True
+
+    def __init__(self, object_list, per_page, ordering_field="pub_date"):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering_field = ordering_field
+
+    @cached_property
+    def is_datetime_ordering(self):
+        try:
+            field = self.object_list.model._meta.get_field(
+                self.ordering_field
+            )
+        except FieldDoesNotExist:
+            # Аннотации вроде score поиска - числа.
+            return False
+        return isinstance(field, DateTimeField)
+
+    def _decode_value(self, value):
+        if self.is_datetime_ordering:
+            return parse_datetime(value) if isinstance(value, str) else None
+        if isinstance(value, bool) or not isinstance(value, (float, int)):
+            return None
+        return value
+
+    def encode_cursor(self, obj, backwards=False):
+        value = getattr(obj, self.ordering_field)
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        position = (
+            value,
+            obj.pk,
+            int(backwards),
+        )
+        return base64.urlsafe_b64encode(
+            json.dumps(position, separators=(",", ":")).encode()
+        ).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            value, pk, backwards = json.loads(
+                base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            )
+            value = self._decode_value(value)
+        except (binascii.Error, TypeError, ValueError):
+            return None
+        if value is None:
+            return None
+        if not isinstance(pk, int):
+            return None
+        return value, pk, bool(backwards)
+
+    def _first_page(self):
+        rows = list(self._ordered(descending=True)[:self.per_page + 1])
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            next_cursor = self.encode_cursor(rows[-1])
+        return CursorPage(rows, self, next_cursor=next_cursor)
+
+    def _ordered(self, descending):
+        prefix = "-" if descending else ""
+        return self.object_list.order_by(
+            f"{prefix}{self.ordering_field}", f"{prefix}pk"
+        )
+
+    def _seek(self, value, pk, descending):
+        lookup = "lt" if descending else "gt"
+        # Нестрогое условие отдельно от OR: по нему база ищет начало
+        # страницы в индексе, а не перебирает его с первой строки.
+        return self._ordered(descending).filter(
+            Q(**{f"{self.ordering_field}__{lookup}e": value})
+            & (
+                Q(**{f"{self.ordering_field}__{lookup}": value})
+                | Q(**{self.ordering_field: value, f"pk__{lookup}": pk})
+            )
+        )
+
+    def get_page(self, cursor):
+        position = self.decode_cursor(cursor)
+        if position is None:
+            return self._first_page()
+        value, pk, backwards = position
+        rows = list(
+            self._seek(value, pk, not backwards)[:self.per_page + 1]
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not rows or backwards and not has_more:
+            return self._first_page()
+        if backwards:
+            rows.reverse()
+            next_cursor = self.encode_cursor(rows[-1])
+            previous_cursor = self.encode_cursor(rows[0], backwards=True)
+        else:
+            next_cursor = self.encode_cursor(rows[-1]) if has_more else None
+            previous_cursor = self.encode_cursor(rows[0], backwards=True)
+        return CursorPage(
+            rows,
+            self,
+            cursor=cursor,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+        )
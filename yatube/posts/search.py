@@ -0,0 +1,142 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .constants import SEARCH_SNIPPET_TOKENS
+from .models import Post
+
+SEARCH_TABLE = "posts_post_search"
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+SEARCH_INDEX_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        text,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {SEARCH_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+)
+
+
+def search_enabled(using=connection):
+    return using.vendor == "sqlite"
+
+
+def install_search_index(using=connection):
+    if not search_enabled(using):
+        return
+    with using.cursor() as cursor:
+        for sql in SEARCH_INDEX_SQL:
+            cursor.execute(sql)
+
+
+def restore_search_index(using=connection):
+    if SEARCH_TABLE in using.introspection.table_names():
+        install_search_index(using)
+
+
+def drop_search_index(using=connection):
+    if not search_enabled(using):
+        return
+    with using.cursor() as cursor:
+        for suffix in ("insert", "delete", "update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def rebuild_search_index(using=connection):
+    if not search_enabled(using):
+        return 0
+    install_search_index(using)
+    with using.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"
+        )
+        cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def match_expression(query):
+    return " ".join(
+        '"{}"*'.format(term) for term in re.findall(r"\w+", query.lower())
+    )
+
+
+def filter_by_search(queryset, query):
+    return queryset.extra(
+        where=(
+            f"posts_post.id IN (SELECT rowid FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s)",
+        ),
+        params=(match_expression(query),),
+    )
+
+
+def search_posts(query):
+    expression = match_expression(query)
+    if not expression:
+        return Post.objects.none()
+    if not search_enabled():
+        return Post.objects.filter(text__icontains=query).annotate(
+            score=RawSQL("0.0", ()),
+        )
+    return Post.objects.extra(
+        tables=(SEARCH_TABLE,),
+        where=(
+            f"{SEARCH_TABLE}.rowid = posts_post.id",
+            f"{SEARCH_TABLE} MATCH %s",
+        ),
+        params=(expression,),
+    ).annotate(score=RawSQL(f"-{SEARCH_TABLE}.rank", ()))
+
+
+def with_snippets(queryset):
+    if not search_enabled():
+        return queryset.extra(
+            select={"snippet": 'substr("posts_post"."text", 1, 200)'}
+        )
+    return queryset.extra(
+        select={
+            "snippet": f"snippet({SEARCH_TABLE}, 0, %s, %s, %s, %s)",
+        },
+        select_params=(
+            HIGHLIGHT_START, HIGHLIGHT_END, "…", SEARCH_SNIPPET_TOKENS,
+        ),
+    )
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_END, "</mark>")
+    )
@@ -0,0 +1,188 @@
+from django.db import connections
+from django.db.models.signals import (
+    post_delete, post_migrate, post_save, pre_save,
+)
+from django.dispatch import receiver
+
+from .caching import bump_generation, touch_generation
+from .conditional import followers_generation, follows_generation
+from .constants import COMMENTS_GENERATION, FEED_GENERATION
+from .counters import (
+    change_group_posts, change_post_comments, change_user_stats,
+)
+from .feeds import invalidate_followees, invalidate_recent_posts
+from .lookup import index_group, index_user, remove_from_index
+from .media import update_post_image
+from .models import (
+    Comment, Follow, Group, NameTrigram, Post, User, UserStats,
+)
+from .search import restore_search_index
+from .timelines import (
+    backfill_timeline, fan_out_post, prune_timeline, timelines_enabled,
+    update_author_delivery,
+)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_counts(sender, **kwargs):
+    bump_generation(sender._meta.label_lower)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_author_recent_posts(sender, instance, **kwargs):
+    invalidate_recent_posts(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    if created and timelines_enabled():
+        fan_out_post(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_feed_fragments(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {"last_login"}:
+        return
+    touch_generation(FEED_GENERATION)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments_responses(sender, **kwargs):
+    touch_generation(COMMENTS_GENERATION)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follower_pages(sender, instance, **kwargs):
+    touch_generation(follows_generation(instance.user_id))
+    touch_generation(followers_generation(instance.author.username))
+
+
+@receiver(post_save, sender=Follow)
+def deliver_followed_posts(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    invalidate_followees(instance.user_id)
+    if timelines_enabled():
+        backfill_timeline(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_unfollowed_posts(sender, instance, **kwargs):
+    invalidate_followees(instance.user_id)
+    if timelines_enabled():
+        prune_timeline(instance.user_id, (instance.author_id,))
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._previous_group_id, instance._previous_image = (
+        Post.objects.filter(pk=instance.pk).values_list(
+            "group_id", "image"
+        ).first() or (None, "")
+    )
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        change_user_stats(instance.author_id, posts_count=1)
+        change_group_posts(instance.group_id, 1)
+        return
+    previous_group_id = getattr(instance, "_previous_group_id", None)
+    if previous_group_id != instance.group_id:
+        change_group_posts(previous_group_id, -1)
+        change_group_posts(instance.group_id, 1)
+
+
+@receiver(post_save, sender=Post)
+def update_post_image_references(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_post_image(
+            getattr(instance, "_previous_image", ""), instance.image.name
+        )
+
+
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, **kwargs):
+    update_post_image(instance.image.name, "")
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_user_stats(instance.author_id, posts_count=-1)
+    change_group_posts(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_post_comments(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    change_post_comments(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_saved_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        change_user_stats(instance.author_id, followers_count=1)
+        change_user_stats(instance.user_id, following_count=1)
+        update_author_delivery(instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    change_user_stats(instance.author_id, followers_count=-1)
+    change_user_stats(instance.user_id, following_count=-1)
+    update_author_delivery(instance.author_id)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.name == "posts":
+        restore_search_index(connections[using])
+
+
+@receiver(post_save, sender=User)
+def index_user_names(sender, instance, raw=False, update_fields=None,
+                     **kwargs):
+    if raw or update_fields and set(update_fields) == {"last_login"}:
+        return
+    index_user(instance)
+
+
+@receiver(post_save, sender=Group)
+def index_group_title(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_group(instance)
+
+
+@receiver(post_delete, sender=User)
+def remove_user_names(sender, instance, **kwargs):
+    remove_from_index(NameTrigram.KIND_USER, instance.pk)
+
+
+@receiver(post_delete, sender=Group)
+def remove_group_title(sender, instance, **kwargs):
+    remove_from_index(NameTrigram.KIND_GROUP, instance.pk)
@@ -0,0 +1,44 @@
+import sorl
+from django.core import checks
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.cached_db_kvstore import KVStore as CachedDBStore
+
+# Закрытые API sorl-thumbnail, которыми пользуются пакетные запросы
+# миниатюр и сборка мусора. Проверены на версии из requirements.txt.
+SORL_SUPPORTED_VERSION = "12.10"
+
+
+def thumbnail_name(name, geometry, options):
+    return default.backend._get_thumbnail_filename(
+        ImageFile(name), geometry, options
+    )
+
+
+def get_raw(key):
+    return default.kvstore._get_raw(key)
+
+
+def find_keys(identity):
+    return default.kvstore._find_keys(identity=identity)
+
+
+def kvstore_cache():
+    """Кэш перед таблицей KVStore или None, если хранилище не cached_db."""
+    if isinstance(default.kvstore, CachedDBStore):
+        return default.kvstore.cache
+    return None
+
+
+@checks.register()
+def check_sorl_version(app_configs, **kwargs):
+    if sorl.__version__.startswith(f"{SORL_SUPPORTED_VERSION}."):
+        return []
+    return [checks.Warning(
+        f"sorl-thumbnail {sorl.__version__} не проверена с posts.sorl_compat",
+        hint=(
+            f"Проверьте закрытые API, которые использует модуль, и обновите "
+            f"SORL_SUPPORTED_VERSION (сейчас {SORL_SUPPORTED_VERSION})."
+        ),
+        id="posts.W001",
+    )]
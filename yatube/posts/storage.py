@@ -0,0 +1,49 @@
+import hashlib
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+from .constants import MEDIA_SHARD_DEPTH, MEDIA_SHARD_WIDTH
+
+HASH_NAME_RE = re.compile(
+    r"(?:^|/)(?:[0-9a-f]{%d}/){%d}[0-9a-f]{64}\.\w+$"
+    % (MEDIA_SHARD_WIDTH, MEDIA_SHARD_DEPTH)
+)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+        shards = [
+            digest[i * MEDIA_SHARD_WIDTH:(i + 1) * MEDIA_SHARD_WIDTH]
+            for i in range(MEDIA_SHARD_DEPTH)
+        ]
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return "/".join(
+            filter(None, (directory, *shards, digest + extension))
+        )
+
+    def is_content_addressed(self, name):
+        return bool(HASH_NAME_RE.search(name))
+
+    def _save(self, name, content):
+        name = self.content_name(name, content)
+        if self.exists(name):
+            # Свежий mtime не дает сборщику мусора удалить файл, на который
+            # вот-вот сошлется новый пост.
+            os.utime(self.path(name))
+            return name
+        partial_name = super()._save(f"{name}.partial", content)
+        os.replace(self.path(partial_name), self.path(name))
+        return name
+
+
+post_image_storage = ContentAddressedStorage()
@@ -0,0 +1,53 @@
+import re
+
+from django.db import transaction
+
+from .caching import touch_generation
+from .constants import FEED_GENERATION, TAG_MAX_LENGTH
+from .feeds import TagFeed
+from .models import PostTag, Tag
+
+HASHTAG_RE = re.compile(r"(?<![\w#&])#(\w{1,%d})(?!\w)" % TAG_MAX_LENGTH)
+
+
+def extract_tags(text):
+    return {name.lower() for name in HASHTAG_RE.findall(text)}
+
+
+def get_or_create_tags(names):
+    names = set(names)
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing = names - set(tags)
+    if missing:
+        Tag.objects.bulk_create(
+            (Tag(name=name) for name in missing), ignore_conflicts=True
+        )
+        tags.update(
+            (tag.name, tag) for tag in Tag.objects.filter(name__in=missing)
+        )
+    return tags
+
+
+def set_post_tags(post):
+    names = extract_tags(post.text)
+    current = set(
+        post.post_tags.values_list("tag__name", flat=True)
+    )
+    if names == current:
+        return False
+    with transaction.atomic():
+        post.post_tags.exclude(tag__name__in=names).delete()
+        tags = get_or_create_tags(names - current)
+        PostTag.objects.bulk_create(
+            (
+                PostTag(tag=tag, post=post, pub_date=post.pub_date)
+                for tag in tags.values()
+            ),
+            ignore_conflicts=True,
+        )
+    touch_generation(FEED_GENERATION)
+    return True
+
+
+def get_tag_posts(tag):
+    return TagFeed(tag)
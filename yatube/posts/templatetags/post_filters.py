@@ -0,0 +1,55 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.html import escape, format_html
+from django.utils.safestring import mark_safe
+
+from ..constants import IMAGE_VARIANT_FORMATS, IMAGE_VARIANT_SIZES
+from ..tags import HASHTAG_RE
+
+register = template.Library()
+
+
+@register.filter
+def linkify_tags(text):
+    return mark_safe(HASHTAG_RE.sub(
+        lambda match: format_html(
+            '<a href="{}">#{}</a>',
+            reverse("posts:tag_posts", args=(match.group(1).lower(),)),
+            match.group(1),
+        ),
+        escape(text),
+    ))
+
+
+@register.filter
+def thumbnail_of(thumbnails, post):
+    return thumbnails.get(post.pk)
+
+
+def _srcset(variants):
+    return ", ".join(
+        f"{default_storage.url(variant.file)} {variant.width}w"
+        for variant in variants
+    )
+
+
+@register.inclusion_tag("includes/picture.html")
+def post_picture(post, variants, src):
+    formats = (variants or {}).get(post.image.name, {})
+    sources = [
+        (mime_type, _srcset(formats[mime_type]))
+        for _, mime_type, *_ in IMAGE_VARIANT_FORMATS
+        if mime_type in formats
+    ]
+    largest = max(
+        (variant for items in formats.values() for variant in items),
+        key=lambda variant: variant.width,
+        default=None,
+    )
+    return {
+        "sources": sources,
+        "sizes": IMAGE_VARIANT_SIZES,
+        "src": src,
+        "largest": largest,
+    }
@@ -0,0 +1,182 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User, UserStats
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+        cls.user = User.objects.create_user(username="TestUser")
+
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            description="Описание тестовой группы",
+            slug="test"
+        )
+        cls.another_group = Group.objects.create(
+            title="Другая группа",
+            description="Описание другой группы",
+            slug="another"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(CountersTests.user)
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_post_counters(self):
+        """Проверяем счетчики постов автора и группы"""
+        post = Post.objects.create(
+            text="Тестовый пост",
+            author=CountersTests.author,
+            group=CountersTests.group,
+        )
+        self.assertEqual(self.stats(CountersTests.author).posts_count, 1)
+        CountersTests.group.refresh_from_db()
+        self.assertEqual(CountersTests.group.posts_count, 1)
+
+        post.group = CountersTests.another_group
+        post.save()
+        CountersTests.group.refresh_from_db()
+        CountersTests.another_group.refresh_from_db()
+        self.assertEqual(CountersTests.group.posts_count, 0)
+        self.assertEqual(CountersTests.another_group.posts_count, 1)
+
+        post.delete()
+        CountersTests.another_group.refresh_from_db()
+        self.assertEqual(self.stats(CountersTests.author).posts_count, 0)
+        self.assertEqual(CountersTests.another_group.posts_count, 0)
+
+    def test_comments_counter(self):
+        """Проверяем счетчик комментариев поста"""
+        post = Post.objects.create(
+            text="Тестовый пост",
+            author=CountersTests.author,
+        )
+        self.authorized_client.post(
+            reverse("posts:add_comment", args=(post.id,)),
+            data={"text": "Тестовый комментарий"},
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        Comment.objects.get(post=post).delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_stale_instance_keeps_counter(self):
+        """Проверяем, что сохранение устаревшего объекта не сбивает счетчик"""
+        post = Post.objects.create(
+            text="Тестовый пост",
+            author=CountersTests.author,
+        )
+        Comment.objects.create(
+            text="Тестовый комментарий",
+            author=CountersTests.user,
+            post=post,
+        )
+        post.text = "Измененный пост"
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_follow_counters(self):
+        """Проверяем счетчики подписчиков и подписок"""
+        url_args = (CountersTests.author.username,)
+        self.authorized_client.get(
+            reverse("posts:profile_follow", args=url_args)
+        )
+        self.assertEqual(self.stats(CountersTests.author).followers_count, 1)
+        self.assertEqual(self.stats(CountersTests.user).following_count, 1)
+        self.authorized_client.get(
+            reverse("posts:profile_unfollow", args=url_args)
+        )
+        self.assertEqual(self.stats(CountersTests.author).followers_count, 0)
+        self.assertEqual(self.stats(CountersTests.user).following_count, 0)
+
+    def test_repair_counters_command(self):
+        """Проверяем пересчет счетчиков командой repair_counters"""
+        post = Post.objects.create(
+            text="Тестовый пост",
+            author=CountersTests.author,
+            group=CountersTests.group,
+        )
+        Post.objects.bulk_create(
+            Post(text=f"Пост {i}", author=CountersTests.author)
+            for i in range(3)
+        )
+        Comment.objects.bulk_create(
+            Comment(text="Комментарий", author=CountersTests.user, post=post)
+            for _ in range(2)
+        )
+        Follow.objects.bulk_create(
+            (Follow(user=CountersTests.user, author=CountersTests.author),)
+        )
+        UserStats.objects.filter(user=CountersTests.user).delete()
+        Group.objects.update(posts_count=5)
+
+        call_command("repair_counters", batch_size=1, stdout=StringIO())
+
+        author_stats = self.stats(CountersTests.author)
+        self.assertEqual(author_stats.posts_count, 4)
+        self.assertEqual(author_stats.followers_count, 1)
+        self.assertEqual(self.stats(CountersTests.user).following_count, 1)
+        self.assertEqual(
+            dict(Group.objects.values_list("slug", "posts_count")),
+            {"test": 1, "another": 0}
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 2)
+
+    def test_profile_counts_missing_stats(self):
+        """Проверяем подсчет отсутствующей статистики без записи в базу"""
+        Post.objects.create(text="Тестовый пост", author=CountersTests.author)
+        UserStats.objects.filter(user=CountersTests.author).delete()
+        response = self.authorized_client.get(
+            reverse("posts:profile", args=(CountersTests.author.username,))
+        )
+        self.assertEqual(response.context["count_posts"], 1)
+        self.assertFalse(
+            UserStats.objects.filter(user=CountersTests.author).exists()
+        )
+
+    def test_migration_fills_counters(self):
+        """Проверяем заполнение счетчиков миграцией"""
+        post = Post.objects.create(
+            text="Тестовый пост",
+            author=CountersTests.author,
+            group=CountersTests.group,
+        )
+        Comment.objects.create(
+            post=post, author=CountersTests.user, text="Комментарий"
+        )
+        Follow.objects.create(
+            user=CountersTests.user, author=CountersTests.author
+        )
+        UserStats.objects.all().delete()
+        Group.objects.update(posts_count=0)
+        Post.objects.update(comments_count=0)
+        import_module("posts.migrations.0014_counters").fill_counters(
+            apps, None
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(
+            Group.objects.get(pk=CountersTests.group.pk).posts_count, 1
+        )
+        author_stats = self.stats(CountersTests.author)
+        self.assertEqual(author_stats.posts_count, 1)
+        self.assertEqual(author_stats.followers_count, 1)
+        self.assertEqual(self.stats(CountersTests.user).following_count, 1)
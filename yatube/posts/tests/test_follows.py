@@ -0,0 +1,153 @@
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..follows import bulk_follow, bulk_unfollow, follow, unfollow
+from ..feeds import get_followees_ids
+from ..models import Follow, Post, TimelineEntry, User, UserStats
+
+
+class FollowsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+        cls.user = User.objects.create_user(username="TestUser")
+        cls.admin = User.objects.create_superuser(
+            username="TestAdmin", email="admin@test.ru", password="pass"
+        )
+        cls.authors = [
+            User.objects.create_user(username=f"Author{i}")
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(FollowsTests.user)
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_unique_follow_constraint(self):
+        """Проверяем, что повторную подписку нельзя сохранить в базе"""
+        Follow.objects.create(
+            user=FollowsTests.user, author=FollowsTests.author
+        )
+        with self.assertRaises(IntegrityError):
+            Follow.objects.create(
+                user=FollowsTests.user, author=FollowsTests.author
+            )
+
+    def test_follow_is_idempotent(self):
+        """Проверяем, что повторная подписка ничего не меняет"""
+        self.assertTrue(follow(FollowsTests.user, FollowsTests.author))
+        self.assertFalse(follow(FollowsTests.user, FollowsTests.author))
+        self.assertFalse(follow(FollowsTests.user, FollowsTests.user))
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(self.stats(FollowsTests.author).followers_count, 1)
+
+    def test_unfollow_select_and_delete(self):
+        """Проверяем, что отписка выполняется одной выборкой и одним
+        запросом на удаление, а счетчики обновляют сигналы
+        """
+        follow(FollowsTests.user, FollowsTests.author)
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(
+                reverse(
+                    "posts:profile_unfollow",
+                    args=(FollowsTests.author.username,)
+                )
+            )
+        follow_queries = [
+            query["sql"] for query in queries
+            if '"posts_follow"' in query["sql"]
+        ]
+        self.assertEqual(len(follow_queries), 2)
+        self.assertTrue(follow_queries[1].startswith("DELETE"))
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(self.stats(FollowsTests.author).followers_count, 0)
+        self.assertEqual(self.stats(FollowsTests.user).following_count, 0)
+        self.assertFalse(unfollow(FollowsTests.user, FollowsTests.author))
+
+    def test_bulk_follow_and_unfollow(self):
+        """Проверяем массовую подписку и отписку"""
+        follow(FollowsTests.user, FollowsTests.authors[0])
+        pairs = [
+            (FollowsTests.user.id, author.id)
+            for author in FollowsTests.authors
+        ]
+        pairs.append((FollowsTests.user.id, FollowsTests.user.id))
+        self.assertEqual(bulk_follow(pairs, batch_size=2), 4)
+        self.assertEqual(Follow.objects.count(), 5)
+        self.assertEqual(self.stats(FollowsTests.user).following_count, 5)
+        self.assertEqual(
+            self.stats(FollowsTests.authors[4]).followers_count, 1
+        )
+
+        self.assertEqual(bulk_unfollow(pairs[:3], batch_size=2), 3)
+        self.assertEqual(
+            set(Follow.objects.values_list("author_id", flat=True)),
+            {author.id for author in FollowsTests.authors[3:]}
+        )
+        self.assertEqual(self.stats(FollowsTests.user).following_count, 2)
+        self.assertEqual(
+            self.stats(FollowsTests.authors[0]).followers_count, 0
+        )
+
+    @override_settings(POSTS_FOLLOW_FEED="timeline")
+    def test_bulk_unfollow_queries_do_not_grow(self):
+        """Проверяем, что число запросов массовой отписки не зависит от
+        числа авторов
+        """
+        queries = []
+        for authors in (FollowsTests.authors[:1], FollowsTests.authors[1:]):
+            pairs = [(FollowsTests.user.id, author.id) for author in authors]
+            bulk_follow(pairs)
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(bulk_unfollow(pairs), len(pairs))
+            queries.append(len(captured))
+        self.assertEqual(queries[0], queries[1])
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.stats(FollowsTests.user).following_count, 0)
+
+    @override_settings(POSTS_FOLLOW_FEED="timeline")
+    def test_admin_follow_changes(self):
+        """Проверяем, что подписки из админки обновляют счетчики, кэш
+        подписок и ленту подписчика
+        """
+        post = Post.objects.create(text="Пост", author=FollowsTests.author)
+        admin_client = Client()
+        admin_client.force_login(FollowsTests.admin)
+        self.assertEqual(get_followees_ids(FollowsTests.user.pk), [])
+        admin_client.post(
+            reverse("admin:posts_follow_add"),
+            {"user": FollowsTests.user.pk, "author": FollowsTests.author.pk},
+        )
+        self.assertEqual(
+            get_followees_ids(FollowsTests.user.pk), [FollowsTests.author.pk]
+        )
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=FollowsTests.user, post=post
+            ).exists()
+        )
+        self.assertEqual(self.stats(FollowsTests.author).followers_count, 1)
+        admin_client.post(
+            reverse("admin:posts_follow_changelist"),
+            {
+                "action": "delete_selected",
+                "_selected_action": Follow.objects.values_list(
+                    "pk", flat=True
+                ),
+                "post": "yes",
+            },
+        )
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(get_followees_ids(FollowsTests.user.pk), [])
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.stats(FollowsTests.author).followers_count, 0)
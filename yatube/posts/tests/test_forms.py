@@ -5,13 +5,15 @@ from http import HTTPStatus
 from django import forms
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from ..forms import CommentForm, PostForm
 from ..models import Comment, Group, Post, User
+from ..storage import post_image_storage
 
 
+@override_settings(POSTS_THUMBNAIL_WORKERS=0)
 class PostsCreateFormTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -66,6 +68,9 @@ class PostsCreateFormTests(TestCase):
             "group": PostsCreateFormTests.group.pk,
             "image": uploaded,
         }
+        self.image_name = post_image_storage.content_name(
+            "posts/small.gif", uploaded
+        )
         self.posts_count = Post.objects.count()
         self.guest_client = Client()
         self.authorized_client = Client()
@@ -132,7 +137,7 @@ class PostsCreateFormTests(TestCase):
                 text=self.form_data["text"],
                 author=PostsCreateFormTests.user,
                 group=self.form_data["group"],
-                image="posts/small.gif"
+                image=self.image_name
             )
         )
 
@@ -170,7 +175,7 @@ class PostsCreateFormTests(TestCase):
                 text=self.form_data["text"],
                 author=PostsCreateFormTests.author,
                 group=self.form_data["group"],
-                image="posts/small.gif"
+                image=self.image_name
             )
         )
 
@@ -0,0 +1,133 @@
+import io
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_upload(name, size, image_format="JPEG", **options):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "orange").save(buffer, image_format, **options)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    POSTS_THUMBNAIL_WORKERS=0,
+    POSTS_IMAGE_MAX_SIDE=400,
+)
+class ImageIngestTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ImageIngestTests.author)
+
+    def create_post(self, image):
+        return self.authorized_client.post(
+            reverse("posts:post_create"),
+            {"text": "Пост с картинкой", "image": image},
+        )
+
+    def test_large_image_downscaled_and_stripped(self):
+        """Проверяем уменьшение большой картинки и удаление метаданных"""
+        exif = Image.Exif()
+        exif[0x010F] = "Camera"
+        self.create_post(make_upload("big.jpg", (1600, 800), exif=exif))
+        post = Post.objects.get()
+        with Image.open(post.image) as image:
+            self.assertEqual(image.size, (400, 200))
+            self.assertEqual(image.format, "JPEG")
+            self.assertNotIn("exif", image.info)
+
+    def test_small_image_stored_as_is(self):
+        """Проверяем, что небольшая картинка без метаданных не
+        перекодируется
+        """
+        upload = make_upload("small.png", (40, 20), "PNG")
+        content = upload.read()
+        upload.seek(0)
+        self.create_post(upload)
+        with Post.objects.get().image.open() as image:
+            self.assertEqual(image.read(), content)
+
+    def test_limits_rejected_before_decoding(self):
+        """Проверяем отказ для картинок сверх лимитов байт и пикселей"""
+        for limits, code in (
+            ({"POSTS_IMAGE_MAX_BYTES": 100}, "байт"),
+            ({"POSTS_IMAGE_MAX_PIXELS": 100}, "пикселей"),
+        ):
+            with self.subTest(code=code), self.settings(**limits):
+                response = self.create_post(make_upload("big.jpg", (50, 50)))
+                errors = response.context["form"].errors["image"]
+                self.assertIn(code, errors[0])
+                self.assertFalse(Post.objects.exists())
+
+    def test_edit_uses_ingestion(self):
+        """Проверяем уменьшение картинки при редактировании поста"""
+        post = Post.objects.create(text="Пост", author=ImageIngestTests.author)
+        self.authorized_client.post(
+            reverse("posts:post_edit", args=(post.pk,)),
+            {"text": "Пост", "image": make_upload("big.jpg", (800, 1600))},
+        )
+        post.refresh_from_db()
+        self.assertEqual((post.image.width, post.image.height), (200, 400))
+
+    def test_mpo_stored_as_first_frame_jpeg(self):
+        """Проверяем, что из MPO сохраняется только первый кадр в JPEG без
+        метаданных
+        """
+        exif = Image.Exif()
+        exif[0x010F] = "Camera"
+        buffer = io.BytesIO()
+        Image.new("RGB", (40, 20), "orange").save(
+            buffer,
+            "MPO",
+            save_all=True,
+            append_images=(Image.new("RGB", (40, 20), "blue"),),
+            exif=exif,
+        )
+        self.create_post(SimpleUploadedFile("photo.jpg", buffer.getvalue()))
+        with Image.open(Post.objects.get().image) as image:
+            self.assertEqual(image.format, "JPEG")
+            self.assertEqual(getattr(image, "n_frames", 1), 1)
+            self.assertNotIn("exif", image.info)
+
+    def test_animated_image_downscaled_and_stripped(self):
+        """Проверяем уменьшение анимации с сохранением кадров и удаление
+        метаданных
+        """
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 400), "orange").save(
+            buffer,
+            "GIF",
+            save_all=True,
+            append_images=(Image.new("RGB", (800, 400), "blue"),),
+            duration=100,
+            loop=0,
+            comment=b"Camera",
+        )
+        self.create_post(SimpleUploadedFile("anim.gif", buffer.getvalue()))
+        with Image.open(Post.objects.get().image) as image:
+            self.assertEqual(image.size, (400, 200))
+            self.assertEqual(image.format, "GIF")
+            self.assertEqual(image.n_frames, 2)
+            self.assertEqual(image.info["duration"], 100)
+            self.assertNotIn("comment", image.info)
@@ -0,0 +1,84 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..lookup import autocomplete
+from ..models import Group, NameTrigram, User
+
+
+class LookupTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username="leo_tolstoy",
+            first_name="Лев",
+            last_name="Толстой",
+        )
+        cls.another_user = User.objects.create_user(username="dostoevsky")
+
+        cls.group = Group.objects.create(
+            title="Любители литературы",
+            description="Описание тестовой группы",
+            slug="literature"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def labels(self, query):
+        return [result["label"] for result in autocomplete(query)]
+
+    def test_prefix_and_typo_queries(self):
+        """Проверяем поиск по префиксу и с опечатками"""
+        self.assertEqual(self.labels("толс")[0], "Лев Толстой")
+        self.assertEqual(self.labels("толстй")[0], "Лев Толстой")
+        self.assertEqual(self.labels("dostoevksy")[0], "dostoevsky")
+        self.assertEqual(self.labels("литератур"), ["Любители литературы"])
+        self.assertEqual(self.labels("т"), [])
+
+    def test_lookup_endpoint(self):
+        """Проверяем ответ эндпоинта автодополнения"""
+        response = self.guest_client.get(
+            reverse("posts:lookup"), {"q": "любители"}
+        )
+        self.assertEqual(
+            response.json()["results"],
+            [{
+                "kind": NameTrigram.KIND_GROUP,
+                "label": "Любители литературы",
+                "slug": "literature",
+                "url": reverse("posts:group_list", args=("literature",)),
+            }]
+        )
+
+    def test_cached_results_without_queries(self):
+        """Проверяем, что повторный запрос префикса берется из кэша"""
+        autocomplete("толс")
+        with self.assertNumQueries(0):
+            autocomplete("Толс")
+
+    def test_cache_invalidated_by_changes(self):
+        """Проверяем сброс кэша при изменении и удалении пользователей и
+        групп
+        """
+        self.assertEqual(self.labels("поэзии"), [])
+        group = Group.objects.get(pk=LookupTests.group.pk)
+        group.title = "Любители поэзии"
+        group.save()
+        self.assertEqual(self.labels("поэзии"), ["Любители поэзии"])
+        group.delete()
+        self.assertEqual(self.labels("поэзии"), [])
+        User.objects.filter(pk=LookupTests.another_user.pk).delete()
+        self.assertEqual(self.labels("dostoevsky"), [])
+
+    def test_rebuild_lookup_index_command(self):
+        """Проверяем пересборку индекса командой rebuild_lookup_index"""
+        NameTrigram.objects.all().delete()
+        call_command("rebuild_lookup_index", batch_size=1, stdout=StringIO())
+        self.assertEqual(self.labels("толстой"), ["Лев Толстой"])
@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from ..caching import get_generation
+from ..constants import FEED_GENERATION
+from ..media import acquire, delete_unreferenced
+from ..models import Post, StoredFile, User
+from ..storage import post_image_storage
+from .test_thumbnails import OTHER_PICTURE, PICTURE
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POSTS_THUMBNAIL_WORKERS=0)
+class ContentAddressedMediaTests(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="TestAuthor")
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def create_post(self, name, content=PICTURE):
+        self.authorized_client.post(
+            reverse("posts:post_create"),
+            {
+                "text": "Пост с картинкой",
+                "image": SimpleUploadedFile(name, content),
+            },
+        )
+        return Post.objects.latest("pk")
+
+    def test_sharded_content_name(self):
+        """Проверяем имя файла по хешу содержимого с вложенными
+        каталогами
+        """
+        name = post_image_storage.save("posts/Cat.GIF", ContentFile(PICTURE))
+        self.assertRegex(
+            name, r"^posts/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.gif$"
+        )
+        self.assertEqual(name.split("/")[1], name.split("/")[3][:2])
+        self.assertTrue(post_image_storage.is_content_addressed(name))
+        self.assertFalse(
+            post_image_storage.is_content_addressed("posts/cat.gif")
+        )
+
+    def test_duplicates_share_refcounted_file(self):
+        """Проверяем, что одинаковые картинки хранятся одним файлом, который
+        удаляется вместе с последней ссылкой
+        """
+        first = self.create_post("first.gif")
+        second = self.create_post("second.gif")
+        name = first.image.name
+        self.assertEqual(second.image.name, name)
+        self.assertEqual(StoredFile.objects.get(name=name).references, 2)
+        first.delete()
+        self.assertTrue(post_image_storage.exists(name))
+        self.assertEqual(StoredFile.objects.get(name=name).references, 1)
+        os.utime(post_image_storage.path(name), (0, 0))
+        self.authorized_client.post(
+            reverse("posts:post_edit", args=(second.pk,)),
+            {
+                "text": "Новая картинка",
+                "image": SimpleUploadedFile("other.gif", OTHER_PICTURE),
+            },
+        )
+        self.assertFalse(post_image_storage.exists(name))
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+
+    def test_duplicate_upload_refreshes_mtime(self):
+        """Проверяем, что повторная загрузка того же содержимого обновляет
+        время изменения файла
+        """
+        name = post_image_storage.save("posts/cat.gif", ContentFile(PICTURE))
+        path = post_image_storage.path(name)
+        os.utime(path, (0, 0))
+        post_image_storage.save("posts/copy.gif", ContentFile(PICTURE))
+        self.assertGreater(os.path.getmtime(path), 0)
+
+    def test_referenced_file_not_deleted(self):
+        """Проверяем, что файл с новой ссылкой не удаляется отложенной
+        задачей
+        """
+        name = post_image_storage.save("posts/cat.gif", ContentFile(PICTURE))
+        acquire(name)
+        delete_unreferenced(name)
+        self.assertTrue(post_image_storage.exists(name))
+        self.assertEqual(StoredFile.objects.get(name=name).references, 1)
+
+    def test_recent_file_left_for_gc(self):
+        """Проверяем, что только что сохраненный файл без ссылок не
+        удаляется отложенной задачей
+        """
+        name = post_image_storage.save("posts/cat.gif", ContentFile(PICTURE))
+        delete_unreferenced(name)
+        self.assertTrue(post_image_storage.exists(name))
+        os.utime(post_image_storage.path(name), (0, 0))
+        delete_unreferenced(name)
+        self.assertFalse(post_image_storage.exists(name))
+
+    def test_migrate_media_command(self):
+        """Проверяем перенос старых картинок командой migrate_media и сброс
+        кэша страниц со старыми адресами
+        """
+        legacy_storage = FileSystemStorage()
+        names = [
+            legacy_storage.save(f"posts/legacy_{i}.gif", ContentFile(PICTURE))
+            for i in range(2)
+        ]
+        Post.objects.bulk_create(
+            Post(text="Старый пост", author=self.author, image=name)
+            for name in names * 2
+        )
+        generation = get_generation(FEED_GENERATION)
+        call_command("migrate_media", batch_size=1, stdout=StringIO())
+        self.assertGreater(get_generation(FEED_GENERATION), generation)
+        new_names = set(Post.objects.values_list("image", flat=True))
+        self.assertEqual(len(new_names), 1)
+        new_name = new_names.pop()
+        self.assertTrue(post_image_storage.is_content_addressed(new_name))
+        self.assertTrue(post_image_storage.exists(new_name))
+        self.assertFalse(any(map(legacy_storage.exists, names)))
+        self.assertEqual(StoredFile.objects.get(name=new_name).references, 4)
@@ -0,0 +1,89 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from ..media import generate_derived
+from ..models import ImageVariant, Post, User
+from ..storage import post_image_storage
+from .test_thumbnails import OTHER_PICTURE, PICTURE
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POSTS_THUMBNAIL_WORKERS=0)
+class MediaGarbageCollectorTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user(username="TestAuthor")
+        self.name = post_image_storage.save(
+            "posts/kept.gif", ContentFile(PICTURE)
+        )
+        Post.objects.create(text="Пост", author=author, image=self.name)
+        self.orphan = post_image_storage.save(
+            "posts/orphan.gif", ContentFile(OTHER_PICTURE)
+        )
+        self.stray = post_image_storage.save(
+            "cache/zz/stray.jpg", ContentFile(b"stray")
+        )
+        for name in (self.name, self.orphan):
+            generate_derived(name)
+
+    def tearDown(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def gc_media(self, *args):
+        out = StringIO()
+        call_command("gc_media", *args, verbosity=2, stdout=out)
+        return out.getvalue()
+
+    def derived_files(self, name):
+        thumbnails = default.kvstore._get(
+            ImageFile(name).key, identity="thumbnails"
+        ) or ()
+        return [default.kvstore._get(key).name for key in thumbnails] + list(
+            ImageVariant.objects.filter(source=name).values_list(
+                "file", flat=True
+            )
+        )
+
+    def test_report_without_delete(self):
+        """Проверяем, что без --delete сборщик только выводит отчет"""
+        output = self.gc_media("--grace", "0")
+        self.assertIn(self.orphan, output)
+        self.assertIn(self.stray, output)
+        self.assertNotIn(self.name + "\n", output)
+        self.assertTrue(post_image_storage.exists(self.orphan))
+        self.assertTrue(ImageVariant.objects.filter(source=self.orphan))
+
+    def test_orphans_and_stale_entries_deleted(self):
+        """Проверяем удаление файлов без ссылок, их миниатюр и вариантов"""
+        kept = self.derived_files(self.name)
+        orphaned = self.derived_files(self.orphan)
+        self.gc_media("--delete", "--grace", "0", "--batch-size", "2")
+        for name in (self.name, *kept):
+            with self.subTest(name=name):
+                self.assertTrue(post_image_storage.exists(name))
+        for name in (self.orphan, self.stray, *orphaned):
+            with self.subTest(name=name):
+                self.assertFalse(post_image_storage.exists(name))
+        self.assertEqual(self.derived_files(self.orphan), [])
+        self.assertIsNone(default.kvstore.get(ImageFile(self.orphan)))
+
+    def test_recent_files_kept(self):
+        """Проверяем, что недавно загруженные файлы не удаляются"""
+        self.gc_media("--delete")
+        self.assertTrue(post_image_storage.exists(self.orphan))
+        self.assertTrue(post_image_storage.exists(self.stray))
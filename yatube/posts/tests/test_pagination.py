@@ -0,0 +1,244 @@
+import base64
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..constants import POST_PER_PAGE
+from ..models import Follow, Group, Post, User
+from ..paginators import (
+    CachedCountPaginator, CountlessPaginator, CursorPage, CursorPaginator,
+)
+from .constants import TEST_POST_COUNT
+
+CURSOR_MODES = {
+    "index": "cursor",
+    "group_posts": "cursor",
+    "profile": "cursor",
+    "follow_index": "cursor",
+    "tag_posts": "cursor",
+}
+COUNTLESS_MODES = {
+    "index": "countless",
+    "group_posts": "countless",
+    "profile": "countless",
+    "follow_index": "countless",
+    "tag_posts": "countless",
+}
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+        cls.user = User.objects.create_user(username="TestUser")
+
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            description="Описание тестовой группы",
+            slug="test"
+        )
+
+        Follow.objects.create(
+            user=CursorPaginatorTests.user,
+            author=CursorPaginatorTests.author
+        )
+
+        for i in range(TEST_POST_COUNT):
+            Post.objects.create(
+                text=f"Текст тестового поста №: {i} для проверки",
+                author=CursorPaginatorTests.author,
+                group=CursorPaginatorTests.group,
+            )
+
+        cls.paginator = CursorPaginator(Post.objects.all(), POST_PER_PAGE)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(CursorPaginatorTests.user)
+
+    def test_pages_follow_each_other(self):
+        """Проверяем, что страницы по курсору идут без пропусков и повторов"""
+        first_page = CursorPaginatorTests.paginator.get_page(None)
+        second_page = CursorPaginatorTests.paginator.get_page(
+            first_page.next_cursor
+        )
+        self.assertEqual(len(first_page), POST_PER_PAGE)
+        self.assertEqual(len(second_page), TEST_POST_COUNT - POST_PER_PAGE)
+        self.assertFalse(first_page.has_previous())
+        self.assertFalse(second_page.has_next())
+        self.assertEqual(
+            list(first_page) + list(second_page),
+            list(Post.objects.order_by("-pub_date", "-pk"))
+        )
+
+    def test_previous_cursor_returns_previous_page(self):
+        """Проверяем возврат на предыдущую страницу по курсору"""
+        first_page = CursorPaginatorTests.paginator.get_page(None)
+        second_page = CursorPaginatorTests.paginator.get_page(
+            first_page.next_cursor
+        )
+        self.assertEqual(
+            list(CursorPaginatorTests.paginator.get_page(
+                second_page.previous_cursor
+            )),
+            list(first_page)
+        )
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Проверяем, что некорректный курсор открывает первую страницу"""
+        for cursor in ("2", "abc", "W10", "!!!"):
+            with self.subTest(cursor=cursor):
+                page = CursorPaginatorTests.paginator.get_page(cursor)
+                self.assertEqual(page.number, 1)
+                self.assertEqual(len(page), POST_PER_PAGE)
+
+    def test_cursor_value_type_mismatch(self):
+        """Проверяем, что курсор с чужим типом значения не ломает страницу"""
+        post = Post.objects.first()
+        numeric = base64.urlsafe_b64encode(
+            json.dumps([5, 1, 0]).encode()
+        ).decode()
+        response = self.authorized_client.get(
+            reverse("posts:post_details", args=(post.pk,)), {"page": numeric}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["comments"].number, 1)
+        dated = base64.urlsafe_b64encode(
+            json.dumps([post.pub_date.isoformat(), 1, 0]).encode()
+        ).decode()
+        search_paginator = CursorPaginator(
+            Post.objects.all(), POST_PER_PAGE, ordering_field="score"
+        )
+        self.assertIsNone(search_paginator.decode_cursor(dated))
+
+    def test_page_without_count_query(self):
+        """Проверяем, что страница по курсору получается одним запросом"""
+        first_page = CursorPaginatorTests.paginator.get_page(None)
+        with self.assertNumQueries(1):
+            list(CursorPaginatorTests.paginator.get_page(
+                first_page.next_cursor
+            ))
+
+    @override_settings(POSTS_PAGINATION_MODES=CURSOR_MODES)
+    def test_views_use_cursor_pagination(self):
+        """Проверяем работу курсорной пагинации на страницах с постами"""
+        for url in (
+            reverse("posts:index"),
+            reverse("posts:profile", args=(CursorPaginatorTests.author,)),
+            reverse(
+                "posts:group_list", args=(CursorPaginatorTests.group.slug,)
+            ),
+            reverse("posts:follow_index"),
+        ):
+            with self.subTest(url=url):
+                page_obj = self.authorized_client.get(url).context["page_obj"]
+                self.assertIsInstance(page_obj, CursorPage)
+                self.assertEqual(len(page_obj), POST_PER_PAGE)
+                self.assertEqual(
+                    len(self.authorized_client.get(
+                        url, {"page": page_obj.next_cursor}
+                    ).context["page_obj"]),
+                    TEST_POST_COUNT - POST_PER_PAGE
+                )
+
+
+class CountPaginatorsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            description="Описание тестовой группы",
+            slug="test"
+        )
+
+        for i in range(TEST_POST_COUNT):
+            Post.objects.create(
+                text=f"Текст тестового поста №: {i} для проверки",
+                author=CountPaginatorsTests.author,
+                group=CountPaginatorsTests.group,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_cached_count_without_query(self):
+        """Проверяем, что количество постов берется из кэша"""
+        self.assertEqual(
+            CachedCountPaginator(Post.objects.all(), POST_PER_PAGE).count,
+            TEST_POST_COUNT
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                CachedCountPaginator(Post.objects.all(), POST_PER_PAGE).count,
+                TEST_POST_COUNT
+            )
+
+    def test_cached_count_invalidated(self):
+        """Проверяем сброс кэша количества при создании и удалении поста"""
+        CachedCountPaginator(Post.objects.all(), POST_PER_PAGE).count
+        post = Post.objects.create(
+            text="Новый пост",
+            author=CountPaginatorsTests.author,
+        )
+        self.assertEqual(
+            CachedCountPaginator(Post.objects.all(), POST_PER_PAGE).count,
+            TEST_POST_COUNT + 1
+        )
+        post.delete()
+        self.assertEqual(
+            CachedCountPaginator(Post.objects.all(), POST_PER_PAGE).count,
+            TEST_POST_COUNT
+        )
+
+    def test_countless_pages(self):
+        """Проверяем страницы без подсчета общего количества постов"""
+        paginator = CountlessPaginator(Post.objects.all(), POST_PER_PAGE)
+        with self.assertNumQueries(1):
+            first_page = paginator.get_page(1)
+            self.assertEqual(len(first_page), POST_PER_PAGE)
+            self.assertTrue(first_page.has_next())
+        last_page = paginator.get_page(2)
+        self.assertEqual(len(last_page), TEST_POST_COUNT - POST_PER_PAGE)
+        self.assertFalse(last_page.has_next())
+        self.assertTrue(last_page.has_previous())
+        self.assertEqual(paginator.get_page(100).number, 1)
+        self.assertEqual(paginator.get_page("abc").number, 1)
+
+    @override_settings(POSTS_PAGINATION_MODES=COUNTLESS_MODES)
+    def test_views_render_countless_pagination(self):
+        """Проверяем отображение пагинатора без подсчета количества постов"""
+        for url in (
+            reverse("posts:index"),
+            reverse("posts:profile", args=(CountPaginatorsTests.author,)),
+            reverse(
+                "posts:group_list", args=(CountPaginatorsTests.group.slug,)
+            ),
+        ):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url, {"page": 2})
+                self.assertEqual(
+                    len(response.context["page_obj"]),
+                    TEST_POST_COUNT - POST_PER_PAGE
+                )
+                self.assertContains(response, 'href="?page=1"')
+                self.assertNotContains(response, 'href="?page=3"')
+
+    @override_settings(POSTS_PAGINATION_MODES=COUNTLESS_MODES)
+    def test_profile_count_posts_in_countless_mode(self):
+        """Проверяем количество постов автора в режиме без подсчета"""
+        self.assertEqual(
+            self.guest_client.get(
+                reverse("posts:profile", args=(CountPaginatorsTests.author,))
+            ).context["count_posts"],
+            TEST_POST_COUNT
+        )
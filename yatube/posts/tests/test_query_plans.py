@@ -0,0 +1,250 @@
+import re
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..constants import (
+    FOLLOW_FEED_HYBRID, FOLLOW_FEED_JOIN, FOLLOW_FEED_MERGE,
+    FOLLOW_FEED_TIMELINE, POST_PER_PAGE,
+)
+from ..feeds import hybrid_feed
+from ..models import Comment, Follow, Group, Post, User
+from ..paginators import CursorPaginator
+from ..tags import set_post_tags
+from .test_pagination import COUNTLESS_MODES, CURSOR_MODES
+
+FULL_SCAN = re.compile(r"^SCAN ")
+TEMP_SORT = "USE TEMP B-TREE"
+ALLOWED_SCANS = (
+    # Справочник групп для выбора в форме поста.
+    "SCAN posts_group ",
+    # MATCH по полнотекстовому индексу.
+    "SCAN posts_post_search VIRTUAL TABLE INDEX 0:M",
+)
+# Число постов ленты в режиме page кэшируется cached_count.
+COUNT_SCANS = ("SCAN posts_post USING COVERING INDEX ",)
+# Начало ленты без условий читается по индексу даты до LIMIT.
+HEAD_SCANS = ("SCAN posts_post USING INDEX post_pub_date_idx",)
+
+
+def explain(sql, params=()):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def plan_problems(sql, params=()):
+    allowed = ALLOWED_SCANS
+    if sql.startswith("SELECT COUNT(*)"):
+        allowed += COUNT_SCANS
+    elif " WHERE " not in sql and " LIMIT " in sql:
+        allowed += HEAD_SCANS
+    return [
+        step for step in explain(sql, params)
+        if FULL_SCAN.match(step) and not step.startswith(allowed)
+        or TEMP_SORT in step
+    ]
+
+
+def capture_queries(queries):
+    # Планы строятся по запросам с параметрами, как в работе: подставленные
+    # в текст значения SQLite оптимизирует иначе.
+    def wrapper(execute, sql, params, many, context):
+        queries.append((sql, params))
+        return execute(sql, params, many, context)
+    return wrapper
+
+
+class QueryPlansTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+        cls.user = User.objects.create_user(username="TestUser")
+
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            description="Описание тестовой группы",
+            slug="test"
+        )
+
+        Follow.objects.create(
+            user=QueryPlansTests.user,
+            author=QueryPlansTests.author
+        )
+
+        cls.post = Post.objects.create(
+            text="Текст тестового поста",
+            author=QueryPlansTests.author,
+            group=QueryPlansTests.group,
+        )
+        Comment.objects.create(
+            text="Тестовый комментарий",
+            author=QueryPlansTests.user,
+            post=QueryPlansTests.post,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(QueryPlansTests.user)
+
+    def assert_plans(self, urls, allowed=(), data=None):
+        responses = []
+        for url in urls:
+            with self.subTest(url=url):
+                cache.clear()
+                queries = []
+                with connection.execute_wrapper(capture_queries(queries)):
+                    if data is None:
+                        response = self.authorized_client.get(url)
+                    else:
+                        response = self.authorized_client.post(url, data)
+                responses.append(response)
+                for sql, params in queries:
+                    if not sql.startswith("SELECT"):
+                        continue
+                    problems = [
+                        step for step in plan_problems(sql, params)
+                        if not step.startswith(allowed)
+                    ]
+                    self.assertEqual(problems, [], sql)
+        return responses
+
+    def test_views_queries_use_indexes(self):
+        """Проверяем, что запросы страниц обходятся без полного сканирования
+        таблиц и временных сортировок
+        """
+        author = QueryPlansTests.author.username
+        post_id = QueryPlansTests.post.id
+        self.assert_plans((
+            reverse("posts:index"),
+            reverse("posts:group_list", args=(QueryPlansTests.group.slug,)),
+            reverse("posts:profile", args=(author,)),
+            reverse("posts:post_details", args=(post_id,)),
+            reverse("posts:post_comments", args=(post_id,)),
+            reverse("posts:post_edit", args=(post_id,)),
+            reverse("posts:post_create"),
+            reverse("posts:profile_unfollow", args=(author,)),
+            reverse("posts:profile_follow", args=(author,)),
+        ))
+
+    def test_add_comment_uses_indexes(self):
+        """Проверяем планы запросов при добавлении комментария"""
+        self.assert_plans(
+            (reverse("posts:add_comment", args=(QueryPlansTests.post.id,)),),
+            data={"text": "Новый комментарий"},
+        )
+        self.assertEqual(QueryPlansTests.post.comments.count(), 2)
+
+    @override_settings(POSTS_PAGINATION_MODES=CURSOR_MODES)
+    def test_cursor_pages_use_indexes(self):
+        """Проверяем планы запросов страниц с курсорной пагинацией"""
+        # Курсор на новом посте: следующая страница ищется сдвигом.
+        newer_post = Post.objects.create(
+            text="Новый пост",
+            author=QueryPlansTests.author,
+            group=QueryPlansTests.group,
+        )
+        for url in (
+            reverse("posts:index"),
+            reverse("posts:group_list", args=(QueryPlansTests.group.slug,)),
+            reverse(
+                "posts:profile", args=(QueryPlansTests.author.username,)
+            ),
+        ):
+            cursor = CursorPaginator(
+                Post.objects.all(), POST_PER_PAGE
+            ).encode_cursor(newer_post)
+            response, = self.assert_plans((f"{url}?page={cursor}",))
+            self.assertEqual(
+                list(response.context["page_obj"]), [QueryPlansTests.post]
+            )
+
+    def test_follow_feeds_use_indexes(self):
+        """Проверяем планы запросов ленты подписок для всех стратегий на
+        непустой ленте
+        """
+        for strategy in (
+            FOLLOW_FEED_TIMELINE, FOLLOW_FEED_HYBRID, FOLLOW_FEED_MERGE
+        ):
+            with self.settings(POSTS_FOLLOW_FEED=strategy):
+                # Пост создан в режиме join, записей ленты еще нет.
+                call_command("rebuild_timelines", stdout=StringIO())
+                response, = self.assert_plans(
+                    (reverse("posts:follow_index"),)
+                )
+                self.assertEqual(
+                    list(response.context["page_obj"]),
+                    [QueryPlansTests.post],
+                    strategy,
+                )
+
+    def test_hybrid_feed_uses_timeline_index(self):
+        """Проверяем, что разосланные посты гибридной ленты читаются по
+        индексу ленты без сортировки, в том числе со сдвигом курсора
+        """
+        feed = hybrid_feed(QueryPlansTests.user)
+        paginator = CursorPaginator(feed, POST_PER_PAGE)
+        for queryset in (
+            feed.pushed_posts,
+            paginator._seek(
+                QueryPlansTests.post.pub_date, QueryPlansTests.post.pk, True
+            ).pushed_posts,
+        ):
+            sql, params = queryset[:POST_PER_PAGE].query.sql_with_params()
+            self.assertEqual(plan_problems(sql, params), [], sql)
+
+    def test_tag_feed_uses_indexes(self):
+        """Проверяем, что лента тега во всех режимах пагинации использует
+        индекс тега и даты
+        """
+        post = Post.objects.get(pk=QueryPlansTests.post.pk)
+        post.text = "Текст тестового поста #тест"
+        set_post_tags(post)
+        newer_post = Post.objects.create(
+            text="Новый пост #тест", author=QueryPlansTests.author
+        )
+        set_post_tags(newer_post)
+        url = reverse("posts:tag_posts", args=("тест",))
+        cursor = CursorPaginator(
+            Post.objects.all(), POST_PER_PAGE
+        ).encode_cursor(newer_post)
+        for modes, page in (
+            ({}, None), (COUNTLESS_MODES, None), (CURSOR_MODES, cursor)
+        ):
+            with self.settings(POSTS_PAGINATION_MODES=modes):
+                response, = self.assert_plans(
+                    (f"{url}?page={page}" if page else url,)
+                )
+            self.assertIn(post, list(response.context["page_obj"]))
+
+    def test_search_without_full_scans(self):
+        """Проверяем, что поиск идет по полнотекстовому индексу; сортировка
+        по релевантности найденных постов здесь неизбежна
+        """
+        self.assert_plans(
+            (reverse("posts:search") + "?q=тестового",), allowed=(TEMP_SORT,)
+        )
+
+    def test_lookup_without_full_scans(self):
+        """Проверяем, что подсказки ищут по индексу триграмм; группировка
+        и сортировка найденных совпадений здесь неизбежны
+        """
+        self.assert_plans(
+            (reverse("posts:lookup") + "?q=Test",), allowed=(TEMP_SORT,)
+        )
+
+    @override_settings(POSTS_FOLLOW_FEED=FOLLOW_FEED_JOIN)
+    def test_join_follow_feed_without_full_scans(self):
+        """Проверяем, что лента подписок через JOIN не сканирует таблицы
+        целиком; сортировка постов нескольких авторов здесь неизбежна
+        """
+        self.assert_plans(
+            (reverse("posts:follow_index"),), allowed=(TEMP_SORT,)
+        )
@@ -0,0 +1,118 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..constants import POST_PER_PAGE
+from ..models import Post, User
+from ..search import SEARCH_TABLE, search_posts
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+        cls.admin = User.objects.create_superuser(
+            username="TestAdmin", email="admin@test.ru", password="pass"
+        )
+
+        cls.best_post = Post.objects.create(
+            text="Котики, котики и еще раз котики",
+            author=cls.author,
+        )
+        cls.post = Post.objects.create(
+            text="Пост про <b>котики</b> и собак",
+            author=cls.author,
+        )
+        cls.other_post = Post.objects.create(
+            text="Пост про погоду",
+            author=cls.author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        return self.guest_client.get(
+            reverse("posts:search"), {"q": query, **params}
+        )
+
+    def test_ranked_results_with_highlighting(self):
+        """Проверяем ранжирование результатов поиска и подсветку"""
+        response = self.search("котик")
+        self.assertEqual(
+            list(response.context["page_obj"]),
+            [SearchTests.best_post, SearchTests.post]
+        )
+        self.assertContains(response, "<mark>котики</mark>")
+        self.assertContains(response, "&lt;b&gt;<mark>котики</mark>")
+        self.assertNotContains(response, "<b>котики</b>")
+
+    def test_index_follows_post_changes(self):
+        """Проверяем обновление индекса при изменении и удалении постов"""
+        other_post = Post.objects.get(pk=SearchTests.other_post.pk)
+        other_post.text = "Пост про котики"
+        other_post.save()
+        self.assertIn(other_post, search_posts("котики"))
+        self.assertNotIn(other_post, search_posts("погоду"))
+        Post.objects.bulk_create(
+            (Post(text="Котики из импорта", author=SearchTests.author),)
+        )
+        self.assertEqual(search_posts("импорта").count(), 1)
+        Post.objects.filter(pk=SearchTests.post.pk).delete()
+        self.assertFalse(search_posts("собак").exists())
+
+    def test_cursor_pagination(self):
+        """Проверяем курсорную пагинацию результатов поиска"""
+        Post.objects.bulk_create(
+            Post(text=f"Собаки №: {i}", author=SearchTests.author)
+            for i in range(POST_PER_PAGE + 2)
+        )
+        first_page = self.search("собаки").context["page_obj"]
+        second_page = self.search(
+            "собаки", page=first_page.next_cursor
+        ).context["page_obj"]
+        self.assertEqual(len(first_page), POST_PER_PAGE)
+        self.assertEqual(len(second_page), 2)
+        self.assertFalse(set(first_page) & set(second_page))
+
+    def test_empty_query(self):
+        """Проверяем страницу поиска без запроса и с пустым запросом"""
+        for query in ("", "!!!"):
+            with self.subTest(query=query):
+                response = self.search(query)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.context["page_obj"])
+
+    def test_rebuild_search_index_command(self):
+        """Проверяем пересборку индекса командой rebuild_search_index"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) "
+                "VALUES ('delete-all')"
+            )
+        self.assertFalse(search_posts("котики").exists())
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(search_posts("котики").count(), 2)
+
+    def test_admin_search_uses_index(self):
+        """Проверяем, что поиск в админке использует полнотекстовый индекс"""
+        self.guest_client.force_login(SearchTests.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(
+                reverse("admin:posts_post_changelist"), {"q": "котики"}
+            )
+        self.assertEqual(response.context["cl"].result_count, 2)
+        self.assertTrue(
+            any(f"{SEARCH_TABLE} MATCH" in query["sql"] for query in queries)
+        )
+        self.assertFalse(
+            any("LIKE" in query["sql"] for query in queries)
+        )
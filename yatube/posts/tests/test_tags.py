@@ -0,0 +1,116 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..constants import POST_PER_PAGE
+from ..models import Group, Post, PostTag, Tag, User
+from ..tags import extract_tags
+from .test_pagination import CURSOR_MODES
+
+
+class TagsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            description="Описание тестовой группы",
+            slug="test"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(TagsTests.author)
+
+    def create_post(self, text):
+        self.authorized_client.post(
+            reverse("posts:post_create"), {"text": text}
+        )
+        return Post.objects.latest("pk")
+
+    def test_extract_tags(self):
+        """Проверяем выделение хештегов из текста поста"""
+        self.assertEqual(
+            extract_tags("#Котики и #котики, #собаки! a#b &#39; ##"),
+            {"котики", "собаки"}
+        )
+
+    def test_tags_saved_on_create_and_edit(self):
+        """Проверяем сохранение хештегов при создании и редактировании
+        поста
+        """
+        post = self.create_post("Пост про #котики и #собаки")
+        self.assertEqual(
+            set(post.post_tags.values_list("tag__name", flat=True)),
+            {"котики", "собаки"}
+        )
+        self.authorized_client.post(
+            reverse("posts:post_edit", args=(post.pk,)),
+            {"text": "Пост про #котики и #погоду"}
+        )
+        self.assertEqual(
+            set(post.post_tags.values_list("tag__name", flat=True)),
+            {"котики", "погоду"}
+        )
+        self.assertTrue(Tag.objects.filter(name="собаки").exists())
+        self.assertFalse(
+            PostTag.objects.filter(post=post, tag__name="собаки").exists()
+        )
+
+    def test_tag_feed(self):
+        """Проверяем ленту постов по тегу и ее пагинацию"""
+        for i in range(POST_PER_PAGE + 2):
+            self.create_post(f"Пост №{i} про #Котики")
+        self.create_post("Пост про #погоду")
+        response = self.guest_client.get(
+            reverse("posts:tag_posts", args=("Котики",))
+        )
+        page_obj = response.context["page_obj"]
+        self.assertEqual(response.context["tag"].name, "котики")
+        self.assertEqual(len(page_obj), POST_PER_PAGE)
+        self.assertEqual(
+            page_obj[0].text, f"Пост №{POST_PER_PAGE + 1} про #Котики"
+        )
+        second_page = self.guest_client.get(
+            reverse("posts:tag_posts", args=("котики",)), {"page": 2}
+        ).context["page_obj"]
+        self.assertEqual(len(second_page), 2)
+        self.assertEqual(
+            self.guest_client.get(
+                reverse("posts:tag_posts", args=("неттакого",))
+            ).status_code,
+            404
+        )
+
+    @override_settings(POSTS_PAGINATION_MODES=CURSOR_MODES)
+    def test_tag_feed_cursor_pagination(self):
+        """Проверяем курсорную пагинацию ленты тега"""
+        posts = [
+            self.create_post(f"Пост №{i} про #котики")
+            for i in range(POST_PER_PAGE + 2)
+        ]
+        first_page = self.guest_client.get(
+            reverse("posts:tag_posts", args=("котики",))
+        ).context["page_obj"]
+        second_page = self.guest_client.get(
+            reverse("posts:tag_posts", args=("котики",)),
+            {"page": first_page.next_cursor},
+        ).context["page_obj"]
+        self.assertEqual(list(first_page) + list(second_page), posts[::-1])
+
+    def test_tags_rendered_as_links(self):
+        """Проверяем, что хештеги в тексте поста выводятся ссылками"""
+        self.create_post("Пост про <b>#котики</b>")
+        response = self.guest_client.get(reverse("posts:index"))
+        self.assertContains(
+            response,
+            '<a href="{}">#котики</a>'.format(
+                reverse("posts:tag_posts", args=("котики",))
+            )
+        )
+        self.assertNotContains(response, "<b>")
@@ -0,0 +1,182 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import (
+    Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from ..constants import POST_PER_PAGE, POST_THUMBNAILS
+from ..models import ImageVariant, Post, User
+from ..sorl_compat import check_sorl_version
+from ..thumbnails import generate_thumbnails, resolve_thumbnails, submit
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+PICTURE = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+OTHER_PICTURE = PICTURE.replace(b'\xFF\xFF\xFF', b'\x00\xFF\x00', 1)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POSTS_THUMBNAIL_WORKERS=0)
+class ThumbnailsTests(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="TestAuthor")
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def upload(self, name, content=PICTURE):
+        return SimpleUploadedFile(
+            name=name, content=content, content_type="image/gif"
+        )
+
+    def thumbnails(self, name):
+        keys = default.kvstore._get(
+            ImageFile(name).key, identity="thumbnails"
+        )
+        return [default.kvstore._get(key).name for key in keys or ()]
+
+    def test_thumbnails_generated_on_create(self):
+        """Проверяем создание миниатюр после сохранения поста с картинкой"""
+        self.authorized_client.post(
+            reverse("posts:post_create"),
+            {"text": "Пост с картинкой", "image": self.upload("first.gif")},
+        )
+        name = Post.objects.get().image.name
+        thumbnails = self.thumbnails(name)
+        self.assertEqual(len(thumbnails), len(POST_THUMBNAILS))
+        self.assertTrue(all(map(default_storage.exists, thumbnails)))
+        response = self.authorized_client.get(reverse("posts:index"))
+        self.assertContains(response, default_storage.url(thumbnails[0]))
+        self.assertEqual(self.thumbnails(name), thumbnails)
+
+    def test_thumbnails_replaced_on_edit(self):
+        """Проверяем удаление старых и создание новых миниатюр при замене
+        картинки
+        """
+        post = Post.objects.create(
+            text="Пост с картинкой",
+            author=self.author,
+            image=self.upload("first.gif"),
+        )
+        old_name = post.image.name
+        old_thumbnails = self.thumbnails(old_name)
+        os.utime(default_storage.path(old_name), (0, 0))
+        self.authorized_client.post(
+            reverse("posts:post_edit", args=(post.pk,)),
+            {
+                "text": "Новая картинка",
+                "image": self.upload("second.gif", OTHER_PICTURE),
+            },
+        )
+        post.refresh_from_db()
+        self.assertEqual(self.thumbnails(old_name), [])
+        self.assertFalse(any(map(default_storage.exists, old_thumbnails)))
+        self.assertFalse(ImageVariant.objects.filter(source=old_name).exists())
+        self.assertFalse(default_storage.exists(old_name))
+        self.assertEqual(
+            len(self.thumbnails(post.image.name)), len(POST_THUMBNAILS)
+        )
+
+    @override_settings(POSTS_THUMBNAIL_WORKERS=1)
+    def test_thumbnails_generated_by_worker(self):
+        """Проверяем создание миниатюр в фоновом потоке"""
+        name = default_storage.save("posts/worker.gif", self.upload("w.gif"))
+        submit(generate_thumbnails, name).result()
+        self.assertEqual(len(self.thumbnails(name)), len(POST_THUMBNAILS))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POSTS_THUMBNAIL_WORKERS=0)
+class ThumbnailResolverTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+
+        Post.objects.bulk_create(
+            Post(
+                text=f"Пост №{i}",
+                author=ThumbnailResolverTests.author,
+                image=default_storage.save(
+                    f"posts/resolver_{i}.gif",
+                    SimpleUploadedFile(f"resolver_{i}.gif", PICTURE),
+                ),
+            )
+            for i in range(POST_PER_PAGE)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_missing_thumbnails_queued(self):
+        """Проверяем, что недостающие миниатюры ставятся в очередь, а не
+        подставляются при разрешении страницы
+        """
+        posts = list(Post.objects.all())
+        self.assertEqual(resolve_thumbnails(posts), {})
+        cache.clear()
+        thumbnails = resolve_thumbnails(posts)
+        self.assertEqual(set(thumbnails), {post.pk for post in posts})
+
+    def test_page_resolved_in_one_query(self):
+        """Проверяем получение миниатюр всей страницы одним запросом"""
+        posts = list(Post.objects.all())
+        for post in posts:
+            generate_thumbnails(post.image.name)
+        cache.clear()
+        with self.assertNumQueries(1):
+            thumbnails = resolve_thumbnails(posts)
+        with self.assertNumQueries(0):
+            resolve_thumbnails(posts)
+        self.assertEqual(len(thumbnails), POST_PER_PAGE)
+
+    def test_feed_uses_resolved_thumbnails(self):
+        """Проверяем, что лента выводит миниатюры из пакетного запроса, а
+        исходную картинку, пока миниатюра не готова, - до истечения кэша
+        страницы
+        """
+        post = Post.objects.first()
+        response = self.guest_client.get(reverse("posts:index"))
+        self.assertContains(response, f'src="{post.image.url}"')
+        response = self.guest_client.get(reverse("posts:index"))
+        self.assertContains(response, f'src="{post.image.url}"')
+        cache.clear()
+        response = self.guest_client.get(reverse("posts:index"))
+        thumbnail = response.context["thumbnails"][post.pk]
+        self.assertContains(response, f'src="{thumbnail.url}"')
+
+
+class SorlCompatTests(SimpleTestCase):
+    def test_installed_version_supported(self):
+        """Проверяем, что установленная sorl-thumbnail совпадает с версией,
+        на которой проверены закрытые API
+        """
+        self.assertEqual(check_sorl_version(None), [])
+
+    def test_other_version_warns(self):
+        """Проверяем предупреждение для непроверенной версии sorl-thumbnail"""
+        with mock.patch("sorl.__version__", "13.0.0"):
+            messages = check_sorl_version(None)
+        self.assertEqual([message.id for message in messages], ["posts.W001"])
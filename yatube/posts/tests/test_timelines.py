@@ -0,0 +1,337 @@
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..constants import (
+    FOLLOWEES_CACHE_TIMEOUT, POST_PER_PAGE, RECENT_POSTS_CACHE_TIMEOUT,
+)
+from ..models import Follow, Post, TimelineEntry, User
+from ..feeds import MergeFeed
+from ..timelines import get_feed_metrics, pulled_authors
+
+
+@override_settings(POSTS_FOLLOW_FEED="timeline")
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+        cls.user = User.objects.create_user(username="TestUser")
+
+        cls.post = Post.objects.create(
+            text="Пост до подписки",
+            author=cls.author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(TimelineTests.user)
+
+    def follow(self):
+        self.authorized_client.get(
+            reverse(
+                "posts:profile_follow", args=(TimelineTests.author.username,)
+            )
+        )
+
+    def test_follow_backfills_timeline(self):
+        """Проверяем заполнение ленты старыми постами автора при подписке"""
+        self.follow()
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=TimelineTests.user, post=TimelineTests.post
+            ).exists()
+        )
+
+    def test_new_post_fanned_out(self):
+        """Проверяем попадание нового поста в ленты подписчиков"""
+        self.follow()
+        new_post = Post.objects.create(
+            text="Пост после подписки",
+            author=TimelineTests.author,
+        )
+        self.assertEqual(
+            self.authorized_client.get(
+                reverse("posts:follow_index")
+            ).context["page_obj"][0],
+            new_post
+        )
+
+    def test_unfollow_prunes_timeline(self):
+        """Проверяем удаление постов автора из ленты при отписке"""
+        self.follow()
+        self.authorized_client.get(
+            reverse(
+                "posts:profile_unfollow",
+                args=(TimelineTests.author.username,)
+            )
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=TimelineTests.user).exists()
+        )
+        self.assertEqual(
+            len(self.authorized_client.get(
+                reverse("posts:follow_index")
+            ).context["page_obj"]),
+            0
+        )
+
+    def test_rebuild_timelines_command(self):
+        """Проверяем пересборку лент командой rebuild_timelines"""
+        Follow.objects.bulk_create((
+            Follow(user=TimelineTests.user, author=TimelineTests.author),
+        ))
+        self.assertFalse(TimelineEntry.objects.exists())
+        call_command("rebuild_timelines", batch_size=1, stdout=StringIO())
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list("user", "post")),
+            [(TimelineTests.user.id, TimelineTests.post.id)]
+        )
+
+
+@override_settings(
+    POSTS_FOLLOW_FEED="hybrid",
+    POSTS_FANOUT_FOLLOWERS_LIMIT=1,
+    POSTS_FANOUT_FOLLOWERS_LOW_LIMIT=1,
+)
+class HybridFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.popular_author = User.objects.create_user(username="Popular")
+        cls.author = User.objects.create_user(username="TestAuthor")
+        cls.user = User.objects.create_user(username="TestUser")
+        cls.another_user = User.objects.create_user(username="AnotherUser")
+
+        for user in (cls.user, cls.another_user):
+            Follow.objects.create(user=user, author=cls.popular_author)
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(HybridFeedTests.user)
+
+    def test_popular_author_post_not_fanned_out(self):
+        """Проверяем, что посты популярного автора не рассылаются по лентам"""
+        post = Post.objects.create(
+            text="Пост популярного автора",
+            author=HybridFeedTests.popular_author,
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=post).exists()
+        )
+        self.assertEqual(get_feed_metrics()["skipped_fan_outs"], 1)
+
+    def test_feed_merges_pushed_and_pulled_posts(self):
+        """Проверяем объединение разосланных и подтянутых постов в ленте"""
+        posts = [
+            Post.objects.create(text=f"Пост {i}", author=author)
+            for i, author in enumerate((
+                HybridFeedTests.author,
+                HybridFeedTests.popular_author,
+                HybridFeedTests.author,
+            ))
+        ]
+        page_obj = self.authorized_client.get(
+            reverse("posts:follow_index")
+        ).context["page_obj"]
+        self.assertEqual(list(page_obj), posts[::-1])
+        self.assertEqual(
+            get_feed_metrics(),
+            {"fanned_out": 2, "skipped_fan_outs": 1, "pulled": 1}
+        )
+
+    def test_author_back_under_limit(self):
+        """Проверяем раздачу постов автора, вернувшегося под лимит"""
+        post = Post.objects.create(
+            text="Пост популярного автора",
+            author=HybridFeedTests.popular_author,
+        )
+        self.assertIn(HybridFeedTests.popular_author.pk, pulled_authors())
+        Follow.objects.filter(
+            user=HybridFeedTests.another_user,
+            author=HybridFeedTests.popular_author,
+        ).delete()
+        self.assertNotIn(HybridFeedTests.popular_author.pk, pulled_authors())
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=HybridFeedTests.user, post=post
+            ).exists()
+        )
+        page_obj = self.authorized_client.get(
+            reverse("posts:follow_index")
+        ).context["page_obj"]
+        self.assertEqual(list(page_obj), [post])
+
+    @override_settings(POSTS_FANOUT_FOLLOWERS_LOW_LIMIT=0)
+    def test_delivery_switch_hysteresis(self):
+        """Проверяем, что между порогами автор остается подтягиваемым, а
+        при возврате рассылки в ленты попадают только последние посты
+        """
+        posts = [
+            Post.objects.create(
+                text=f"Пост {i}", author=HybridFeedTests.popular_author
+            )
+            for i in range(3)
+        ]
+        another_follow = Follow.objects.filter(
+            user=HybridFeedTests.another_user,
+            author=HybridFeedTests.popular_author,
+        )
+        another_follow.delete()
+        self.assertIn(HybridFeedTests.popular_author.pk, pulled_authors())
+        self.assertFalse(TimelineEntry.objects.filter(
+            author=HybridFeedTests.popular_author
+        ).exists())
+        Follow.objects.create(
+            user=HybridFeedTests.another_user,
+            author=HybridFeedTests.popular_author,
+        )
+        with self.settings(POSTS_FANOUT_FOLLOWERS_LOW_LIMIT=1), \
+                mock.patch("posts.timelines.TIMELINE_BACKFILL_LIMIT", 2):
+            another_follow.delete()
+        self.assertNotIn(HybridFeedTests.popular_author.pk, pulled_authors())
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(
+                user=HybridFeedTests.user,
+                author=HybridFeedTests.popular_author,
+            ).values_list("post", flat=True)),
+            {post.pk for post in posts[1:]},
+        )
+
+    def test_fan_out_without_follower_count(self):
+        """Проверяем, что рассылка поста не считает подписчиков автора"""
+        pulled_authors()
+        with CaptureQueriesContext(connection) as queries:
+            Post.objects.create(text="Пост", author=HybridFeedTests.author)
+        self.assertFalse(any(
+            "COUNT(" in query["sql"] and "posts_follow" in query["sql"]
+            for query in queries
+        ))
+
+    def test_feed_metrics_command(self):
+        """Проверяем вывод метрик командой feed_metrics"""
+        Post.objects.create(text="Пост", author=HybridFeedTests.author)
+        out = StringIO()
+        call_command("feed_metrics", stdout=out)
+        self.assertIn("fanned_out: 1", out.getvalue())
+
+    @override_settings(POSTS_PAGINATION_MODES={"follow_index": "cursor"})
+    def test_hybrid_feed_cursor_pagination(self):
+        """Проверяем курсорную пагинацию объединенной ленты"""
+        posts = [
+            Post.objects.create(text=f"Пост {i}", author=author)
+            for i in range(POST_PER_PAGE)
+            for author in (
+                HybridFeedTests.author, HybridFeedTests.popular_author
+            )
+        ]
+        first_page = self.authorized_client.get(
+            reverse("posts:follow_index")
+        ).context["page_obj"]
+        second_page = self.authorized_client.get(
+            reverse("posts:follow_index"), {"page": first_page.next_cursor}
+        ).context["page_obj"]
+        self.assertEqual(list(first_page) + list(second_page), posts[::-1])
+
+
+@override_settings(POSTS_FOLLOW_FEED="merge")
+class MergeFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.authors = [
+            User.objects.create_user(username=f"TestAuthor{i}")
+            for i in range(3)
+        ]
+        cls.user = User.objects.create_user(username="TestUser")
+
+        for author in cls.authors[:2]:
+            Follow.objects.create(user=cls.user, author=author)
+
+        cls.posts = [
+            Post.objects.create(text=f"Пост {i}", author=author)
+            for i in range(POST_PER_PAGE)
+            for author in cls.authors
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(MergeFeedTests.user)
+
+    def expected_posts(self):
+        return [
+            post for post in reversed(MergeFeedTests.posts)
+            if post.author in MergeFeedTests.authors[:2]
+        ]
+
+    def test_feed_merges_authors_posts(self):
+        """Проверяем слияние последних постов авторов в ленте подписок"""
+        feed = MergeFeed(MergeFeedTests.user.id)
+        self.assertEqual(feed[:POST_PER_PAGE * 2], self.expected_posts())
+        self.assertEqual(feed.count(), POST_PER_PAGE * 2)
+
+    def test_warm_feed_page_without_sorting_query(self):
+        """Проверяем, что при теплом кэше страница собирается одним
+        запросом постов по первичному ключу
+        """
+        MergeFeed(MergeFeedTests.user.id)[:POST_PER_PAGE]
+        with self.assertNumQueries(1):
+            page = MergeFeed(MergeFeedTests.user.id)[:POST_PER_PAGE]
+        self.assertEqual(page, self.expected_posts()[:POST_PER_PAGE])
+
+    def test_follow_and_new_post_invalidate_cache(self):
+        """Проверяем сброс кэша при подписке и публикации нового поста"""
+        self.authorized_client.get(reverse("posts:follow_index"))
+        self.authorized_client.get(
+            reverse(
+                "posts:profile_follow",
+                args=(MergeFeedTests.authors[2].username,)
+            )
+        )
+        new_post = Post.objects.create(
+            text="Новый пост",
+            author=MergeFeedTests.authors[2],
+        )
+        page_obj = self.authorized_client.get(
+            reverse("posts:follow_index")
+        ).context["page_obj"]
+        self.assertEqual(page_obj[0], new_post)
+        self.assertEqual(page_obj.paginator.count, POST_PER_PAGE * 3 + 1)
+
+    def test_feed_caches_expire(self):
+        """Проверяем, что кэши подписок и последних постов авторов
+        ограничены по времени и сбрасываются при подписке через ORM
+        """
+        MergeFeed(MergeFeedTests.user.id)[:POST_PER_PAGE]
+        keys = (
+            f"followees:{MergeFeedTests.user.id}",
+            f"recent_posts:{MergeFeedTests.authors[0].id}",
+        )
+        self.assertTrue(all(cache.get(key) for key in keys))
+        expired = time.time() + max(
+            FOLLOWEES_CACHE_TIMEOUT, RECENT_POSTS_CACHE_TIMEOUT
+        ) + 1
+        with mock.patch("time.time", return_value=expired):
+            for key in keys:
+                with self.subTest(key=key):
+                    self.assertIsNone(cache.get(key))
+        Follow.objects.create(
+            user=MergeFeedTests.user, author=MergeFeedTests.authors[2]
+        )
+        self.assertEqual(
+            MergeFeed(MergeFeedTests.user.id).count(), POST_PER_PAGE * 3
+        )
@@ -0,0 +1,111 @@
+import io
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..constants import IMAGE_VARIANT_WIDTHS
+from ..models import ImageVariant, Post, User
+from ..variants import generate_variants, supported_formats
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(size, image_format="PNG"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "orange").save(buffer, image_format)
+    return ContentFile(buffer.getvalue())
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POSTS_THUMBNAIL_WORKERS=0)
+class ImageVariantsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def create_post(self, size):
+        return Post.objects.create(
+            text="Пост с картинкой",
+            author=ImageVariantsTests.author,
+            image=default_storage.save("posts/big.png", make_image(size)),
+        )
+
+    def test_variants_generated(self):
+        """Проверяем создание вариантов картинки всех ширин и форматов"""
+        post = self.create_post((1200, 800))
+        generate_variants(post.image.name)
+        variants = ImageVariant.objects.filter(source=post.image.name)
+        self.assertEqual(
+            variants.count(),
+            len(IMAGE_VARIANT_WIDTHS) * len(supported_formats())
+        )
+        for variant in variants:
+            with self.subTest(variant=variant.file):
+                with default_storage.open(variant.file) as file:
+                    with Image.open(file) as image:
+                        self.assertEqual(
+                            image.size, (variant.width, variant.height)
+                        )
+                self.assertEqual(
+                    default_storage.size(variant.file), variant.size
+                )
+
+    def test_small_image_not_upscaled(self):
+        """Проверяем, что маленькая картинка не увеличивается"""
+        post = self.create_post((200, 100))
+        generate_variants(post.image.name)
+        self.assertEqual(
+            set(ImageVariant.objects.filter(
+                source=post.image.name
+            ).values_list("width", flat=True)),
+            {200}
+        )
+
+    def test_picture_markup(self):
+        """Проверяем вывод тега picture с srcset в ленте и на странице
+        поста
+        """
+        post = self.create_post((1200, 800))
+        generate_variants(post.image.name)
+        webp = ImageVariant.objects.get(
+            source=post.image.name, mime_type="image/webp", width=320
+        )
+        for url in (
+            reverse("posts:index"),
+            reverse("posts:post_details", args=(post.pk,)),
+        ):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, '<source type="image/webp"')
+                self.assertContains(
+                    response, f"{default_storage.url(webp.file)} 320w"
+                )
+
+    def test_generate_image_variants_command(self):
+        """Проверяем создание недостающих вариантов командой
+        generate_image_variants
+        """
+        post = self.create_post((640, 480))
+        call_command("generate_image_variants", stdout=StringIO())
+        self.assertTrue(
+            ImageVariant.objects.filter(source=post.image.name).exists()
+        )
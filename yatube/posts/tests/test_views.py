@@ -1,19 +1,26 @@
 import shutil
 import tempfile
+from io import StringIO
 
 from django.conf import settings
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from ..constants import POST_PER_PAGE
+from ..constants import COMMENTS_PER_PAGE, POST_PER_PAGE
 from ..forms import PostForm
-from ..models import Follow, Group, Post, User
+from ..models import Comment, Follow, Group, Post, User
+from ..tags import set_post_tags
+from ..thumbnails import generate_thumbnails
 from ..utils import get_author_name
 from .constants import TEST_POST_COUNT
 
 
+@override_settings(POSTS_THUMBNAIL_WORKERS=0)
 class PostsPagesTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -59,6 +66,7 @@ class PostsPagesTests(TestCase):
                 )
             )
         Post.objects.bulk_create(cls.list_posts)
+        call_command("repair_counters", stdout=StringIO())
 
         cls.post = Post.objects.create(
             text="Текст тестового поста для проверки",
@@ -70,6 +78,7 @@ class PostsPagesTests(TestCase):
                 content_type="image/gif"
             ),
         )
+        generate_thumbnails(cls.post.image.name)
 
     @classmethod
     def tearDownClass(cls):
@@ -303,13 +312,72 @@ class PostsPagesTests(TestCase):
             author=PostsPagesTests.author,
         )
         first_response = self.authorized_client.get(reverse("posts:index"))
-        post_for_deleting.delete()
+        Post.objects.filter(pk=post_for_deleting.pk).update(
+            text="Изменение в обход сигналов"
+        )
         second_response = self.authorized_client.get(reverse("posts:index"))
         self.assertEqual(first_response.content, second_response.content)
         cache.clear()
         third_response = self.authorized_client.get(reverse("posts:index"))
         self.assertNotEqual(first_response.content, third_response.content)
 
+    def test_warm_cache_without_posts_queries(self):
+        """Проверяем, что страницы из кэша отдаются без запросов к постам"""
+        for url in (
+            reverse("posts:index"),
+            reverse("posts:group_list", args=(PostsPagesTests.group.slug,)),
+            reverse("posts:profile", args=(PostsPagesTests.author.username,)),
+        ):
+            with self.subTest(url=url):
+                first_response = self.guest_client.get(url)
+                with CaptureQueriesContext(connection) as queries:
+                    second_response = self.guest_client.get(url)
+                self.assertEqual(
+                    first_response.content, second_response.content
+                )
+                self.assertFalse([
+                    query["sql"] for query in queries
+                    if "posts_post" in query["sql"]
+                ])
+
+    def test_cache_invalidated_by_new_post(self):
+        """Проверяем, что новый пост сразу появляется на закэшированных
+        страницах
+        """
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", args=(PostsPagesTests.group.slug,)),
+            reverse("posts:profile", args=(PostsPagesTests.author.username,)),
+        )
+        for url in urls:
+            self.guest_client.get(url)
+        Post.objects.create(
+            text="Новый пост для проверки cache",
+            author=PostsPagesTests.author,
+            group=PostsPagesTests.group,
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(
+                    self.guest_client.get(url),
+                    "Новый пост для проверки cache"
+                )
+
+    def test_cache_invalidated_by_group_and_author_changes(self):
+        """Проверяем сброс кэша при изменении группы и автора"""
+        for obj in (PostsPagesTests.group, PostsPagesTests.author):
+            with self.subTest(obj=obj):
+                generation = self.authorized_client.get(
+                    reverse("posts:index")
+                ).context["cache_generation"]
+                obj.save()
+                self.assertGreater(
+                    self.authorized_client.get(
+                        reverse("posts:index")
+                    ).context["cache_generation"],
+                    generation
+                )
+
 
 class FollowTests(TestCase):
     @classmethod
@@ -368,3 +436,306 @@ class FollowTests(TestCase):
             self.new_authorized_client.get(
                 reverse("posts:follow_index")).context["page_obj"].object_list
         )
+
+
+class CommentsPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+
+        cls.post = Post.objects.create(
+            text="Текст тестового поста для проверки",
+            author=cls.author,
+        )
+
+        Comment.objects.bulk_create(
+            Comment(
+                text=f"Коментарий №: {i}",
+                author=CommentsPaginationTests.author,
+                post=CommentsPaginationTests.post,
+            )
+            for i in range(COMMENTS_PER_PAGE + 5)
+        )
+        cls.comments = list(
+            Comment.objects.order_by("-created", "-pk")
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_post_detail_shows_first_comments_page(self):
+        """Проверяем вывод на странице поста только новых коментариев"""
+        response = self.guest_client.get(
+            reverse(
+                "posts:post_details", args=(CommentsPaginationTests.post.id,)
+            )
+        )
+        comments = response.context["comments"]
+        self.assertEqual(
+            list(comments),
+            CommentsPaginationTests.comments[:COMMENTS_PER_PAGE]
+        )
+        self.assertContains(
+            response,
+            reverse(
+                "posts:post_comments", args=(CommentsPaginationTests.post.id,)
+            ) + f"?page={comments.next_cursor}"
+        )
+
+    def test_comments_fragment_returns_next_batch(self):
+        """Проверяем выдачу следующей порции коментариев фрагментом"""
+        next_cursor = self.guest_client.get(
+            reverse(
+                "posts:post_details", args=(CommentsPaginationTests.post.id,)
+            )
+        ).context["comments"].next_cursor
+        response = self.guest_client.get(
+            reverse(
+                "posts:post_comments", args=(CommentsPaginationTests.post.id,)
+            ),
+            {"page": next_cursor},
+        )
+        self.assertTemplateUsed(response, "includes/comments_list.html")
+        self.assertEqual(
+            list(response.context["comments"]),
+            CommentsPaginationTests.comments[COMMENTS_PER_PAGE:]
+        )
+        self.assertNotContains(response, "js-more-comments")
+
+
+class AnonymousResponseCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            description="Описание тестовой группы",
+            slug="test"
+        )
+
+        cls.post = Post.objects.create(
+            text="Текст тестового поста для проверки #кэш",
+            author=cls.author,
+            group=cls.group,
+        )
+        set_post_tags(cls.post)
+
+        cls.urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", args=(cls.group.slug,)),
+            reverse("posts:tag_posts", args=("кэш",)),
+            reverse("posts:profile", args=(cls.author.username,)),
+            reverse("posts:post_details", args=(cls.post.id,)),
+            reverse("posts:search") + "?q=тестового",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(AnonymousResponseCacheTests.author)
+
+    def test_anonymous_response_from_cache(self):
+        """Проверяем отдачу страниц анонимным пользователям из кэша"""
+        for url in AnonymousResponseCacheTests.urls:
+            with self.subTest(url=url):
+                first_response = self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    second_response = self.guest_client.get(url)
+                self.assertEqual(
+                    first_response.content, second_response.content
+                )
+
+    def test_cache_bypassed_with_cookies(self):
+        """Проверяем, что кэш не используется при наличии сессии или
+        csrf cookie
+        """
+        csrf_client = Client()
+        csrf_client.cookies[settings.CSRF_COOKIE_NAME] = "token"
+        for client in (self.authorized_client, csrf_client):
+            for url in AnonymousResponseCacheTests.urls:
+                with self.subTest(url=url):
+                    client.get(url)
+                    self.assertIsNotNone(client.get(url).context)
+
+    def test_anonymous_response_without_cookies(self):
+        """Проверяем, что анонимные страницы не зависят от cookie и не
+        устанавливают их
+        """
+        for url in AnonymousResponseCacheTests.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertNotIn("Cookie", response.get("Vary", ""))
+                self.assertFalse(response.cookies)
+        self.assertIn(
+            "Cookie",
+            self.authorized_client.get(
+                AnonymousResponseCacheTests.urls[0]
+            ).get("Vary", "")
+        )
+
+    def test_cache_invalidated_by_comment(self):
+        """Проверяем сброс кэша страницы поста при новом коментарии"""
+        url = reverse(
+            "posts:post_details", args=(AnonymousResponseCacheTests.post.id,)
+        )
+        self.guest_client.get(url)
+        Comment.objects.create(
+            post=AnonymousResponseCacheTests.post,
+            author=AnonymousResponseCacheTests.author,
+            text="Новый коментарий",
+        )
+        self.assertContains(self.guest_client.get(url), "Новый коментарий")
+
+    def test_search_cache_invalidated_by_new_post(self):
+        """Проверяем сброс кэша результатов поиска при новом посте"""
+        url = reverse("posts:search") + "?q=свежий"
+        self.guest_client.get(url)
+        Post.objects.create(
+            text="Свежий пост", author=AnonymousResponseCacheTests.author
+        )
+        self.assertContains(self.guest_client.get(url), "<mark>Свежий</mark>")
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username="TestAuthor")
+        cls.user = User.objects.create_user(username="TestUser")
+        cls.another_user = User.objects.create_user(username="AnotherUser")
+
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            description="Описание тестовой группы",
+            slug="test"
+        )
+
+        cls.post = Post.objects.create(
+            text="Текст тестового поста для проверки",
+            author=cls.author,
+            group=cls.group,
+        )
+
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+        cls.urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", args=(cls.group.slug,)),
+            reverse("posts:profile", args=(cls.author.username,)),
+            reverse("posts:post_details", args=(cls.post.id,)),
+            reverse("posts:follow_index"),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ConditionalGetTests.user)
+
+    def test_not_modified_without_page_queries(self):
+        """Проверяем ответ 304 на условный запрос без запросов к постам"""
+        for url in ConditionalGetTests.urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertTrue(response.has_header("ETag"))
+                self.assertTrue(response.has_header("Last-Modified"))
+                with CaptureQueriesContext(connection) as queries:
+                    not_modified = self.authorized_client.get(
+                        url, HTTP_IF_NONE_MATCH=response["ETag"]
+                    )
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertFalse([
+                    query["sql"] for query in queries
+                    if "posts_post" in query["sql"]
+                ])
+
+    def test_etag_changes_with_content(self):
+        """Проверяем смену ETag после нового коментария и подписки"""
+        url = reverse(
+            "posts:post_details", args=(ConditionalGetTests.post.id,)
+        )
+        etag = self.authorized_client.get(url)["ETag"]
+        Comment.objects.create(
+            post=ConditionalGetTests.post,
+            author=ConditionalGetTests.user,
+            text="Новый коментарий",
+        )
+        self.assertEqual(
+            self.authorized_client.get(
+                url, HTTP_IF_NONE_MATCH=etag
+            ).status_code,
+            200
+        )
+        url = reverse("posts:profile", args=(ConditionalGetTests.author,))
+        etag = self.authorized_client.get(url)["ETag"]
+        Follow.objects.filter(user=ConditionalGetTests.user).delete()
+        self.assertEqual(
+            self.authorized_client.get(
+                url, HTTP_IF_NONE_MATCH=etag
+            ).status_code,
+            200
+        )
+
+    def test_profile_changes_with_followers(self):
+        """Проверяем, что подписка другого пользователя обновляет профиль"""
+        url = reverse("posts:profile", args=(ConditionalGetTests.author,))
+        response = self.authorized_client.get(url)
+        anonymous = self.client.get(url)
+        Follow.objects.create(
+            user=ConditionalGetTests.another_user,
+            author=ConditionalGetTests.author,
+        )
+        response = self.authorized_client.get(
+            url, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["stats"].followers_count, 2)
+        self.assertContains(self.client.get(url), "Подписчиков: 2")
+        self.assertContains(anonymous, "Подписчиков: 1")
+
+    def modified_since(self, client, url, response):
+        return client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        ).status_code
+
+    def test_last_modified_after_edit_and_delete(self):
+        """Проверяем, что правка и удаление поста сбрасывают
+        If-Modified-Since
+        """
+        author_client = Client()
+        author_client.force_login(ConditionalGetTests.author)
+        url = reverse(
+            "posts:post_details", args=(ConditionalGetTests.post.id,)
+        )
+        response = self.authorized_client.get(url)
+        author_client.post(
+            reverse("posts:post_edit", args=(ConditionalGetTests.post.id,)),
+            {"text": "Исправленный текст"},
+        )
+        self.assertEqual(
+            self.modified_since(self.authorized_client, url, response), 200
+        )
+        url = reverse("posts:index")
+        response = self.authorized_client.get(url)
+        Post.objects.filter(pk=ConditionalGetTests.post.pk).delete()
+        self.assertEqual(
+            self.modified_since(self.authorized_client, url, response), 200
+        )
+
+    def test_if_modified_since(self):
+        """Проверяем ответ 304 по заголовку If-Modified-Since"""
+        response = self.authorized_client.get(ConditionalGetTests.urls[0])
+        self.assertEqual(
+            self.authorized_client.get(
+                ConditionalGetTests.urls[0],
+                HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+            ).status_code,
+            304
+        )
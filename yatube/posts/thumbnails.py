@@ -0,0 +1,116 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from sorl.thumbnail import default, delete, get_thumbnail
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+from sorl.thumbnail.models import KVStore
+
+from .constants import POST_THUMBNAILS, THUMBNAIL_QUEUED_TIMEOUT
+from .sorl_compat import get_raw, kvstore_cache, thumbnail_name
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.POSTS_THUMBNAIL_WORKERS,
+            thread_name_prefix="thumbnails",
+        )
+    return _executor
+
+
+def generate_thumbnails(name):
+    for geometry, options in POST_THUMBNAILS:
+        get_thumbnail(name, geometry, **options)
+
+
+def invalidate_thumbnails(name):
+    delete(name, delete_file=False)
+
+
+def _run(task, name):
+    close_old_connections()
+    try:
+        task(name)
+    except Exception:
+        logger.exception("Thumbnail task %s failed for %s", task, name)
+    finally:
+        close_old_connections()
+
+
+def submit(task, name):
+    if not settings.POSTS_THUMBNAIL_WORKERS:
+        return _run(task, name)
+    return get_executor().submit(_run, task, name)
+
+
+def schedule(task, name):
+    transaction.on_commit(lambda: submit(task, name))
+
+
+def thumbnail_file(name, geometry, options):
+    backend = default.backend
+    options = dict(options)
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    return ImageFile(thumbnail_name(name, geometry, options), default.storage)
+
+
+def get_many_raw(keys):
+    store_cache = kvstore_cache()
+    if store_cache is None:
+        return {key: get_raw(key) for key in keys}
+    values = store_cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        found = dict(
+            KVStore.objects.filter(key__in=missing).values_list("key", "value")
+        )
+        store_cache.set_many(
+            {key: found.get(key, EMPTY_VALUE) for key in missing},
+            sorl_settings.THUMBNAIL_CACHE_TIMEOUT,
+        )
+        values.update(found)
+    return {
+        key: value for key, value in values.items()
+        if value and value != EMPTY_VALUE
+    }
+
+
+def queue_thumbnails(name):
+    if cache.add(
+        f"thumbnails:queued:{name}", True, THUMBNAIL_QUEUED_TIMEOUT
+    ):
+        submit(generate_thumbnails, name)
+
+
+def resolve_thumbnails(posts, geometry=POST_THUMBNAILS[0]):
+    files = {
+        post.pk: thumbnail_file(post.image.name, *geometry)
+        for post in posts if post.image
+    }
+    keys = {pk: add_prefix(file.key, "image") for pk, file in files.items()}
+    values = get_many_raw(list(keys.values()))
+    thumbnails = {}
+    for post in posts:
+        value = values.get(keys.get(post.pk))
+        if value:
+            thumbnails[post.pk] = deserialize_image_file(value)
+        elif post.image:
+            queue_thumbnails(post.image.name)
+    return thumbnails
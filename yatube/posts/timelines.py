@@ -0,0 +1,174 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .caching import bump_generation, increment
+from .constants import (
+    FOLLOW_FEED_HYBRID, FOLLOW_FEED_TIMELINE, PULLED_AUTHORS_CACHE_TIMEOUT,
+    TIMELINE_BACKFILL_LIMIT, TIMELINE_BATCH_SIZE,
+)
+from .models import Follow, Post, TimelineEntry, UserStats
+
+PULLED_AUTHORS_KEY = "timelines:pulled_authors"
+FEED_METRICS = ("fanned_out", "skipped_fan_outs", "pulled")
+
+
+def timelines_enabled():
+    return settings.POSTS_FOLLOW_FEED in (
+        FOLLOW_FEED_TIMELINE, FOLLOW_FEED_HYBRID
+    )
+
+
+def record_metric(name, value=1):
+    if value:
+        increment(f"feed_metrics:{name}", value)
+
+
+def get_feed_metrics():
+    values = cache.get_many([f"feed_metrics:{name}" for name in FEED_METRICS])
+    return {
+        name: values.get(f"feed_metrics:{name}", 0) for name in FEED_METRICS
+    }
+
+
+def pulled_authors():
+    if settings.POSTS_FOLLOW_FEED != FOLLOW_FEED_HYBRID:
+        return frozenset()
+    authors = cache.get(PULLED_AUTHORS_KEY)
+    if authors is None:
+        authors = frozenset(
+            UserStats.objects.filter(fanout_pulled=True).values_list(
+                "user_id", flat=True
+            )
+        )
+        cache.set(PULLED_AUTHORS_KEY, authors, PULLED_AUTHORS_CACHE_TIMEOUT)
+    return authors
+
+
+def is_pulled_author(author_id):
+    return author_id in pulled_authors()
+
+
+def _entries(users_ids, posts):
+    return [
+        TimelineEntry(
+            user_id=user_id,
+            post_id=post.id,
+            author_id=post.author_id,
+            pub_date=post.pub_date,
+        )
+        for user_id in users_ids
+        for post in posts
+    ]
+
+
+def _invalidate_counts():
+    bump_generation(TimelineEntry._meta.label_lower)
+
+
+def _chunks(values, size):
+    chunk = []
+    for value in values:
+        chunk.append(value)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def fan_out_post(post, batch_size=TIMELINE_BATCH_SIZE):
+    if is_pulled_author(post.author_id):
+        record_metric("skipped_fan_outs")
+        return 0
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list("user_id", flat=True)
+    created = 0
+    for users_ids in _chunks(followers.iterator(), batch_size):
+        TimelineEntry.objects.bulk_create(
+            _entries(users_ids, (post,)), ignore_conflicts=True
+        )
+        created += len(users_ids)
+    _invalidate_counts()
+    record_metric("fanned_out", created)
+    return created
+
+
+def _insert_entries(users_ids, author_id, batch_size, limit=None):
+    posts = Post.objects.filter(author_id=author_id).only(
+        "id", "author_id", "pub_date"
+    )
+    if limit is not None:
+        posts = posts.order_by("-pub_date")[:limit]
+    for chunk in _chunks(posts.iterator(), batch_size):
+        users_per_batch = max(batch_size // len(chunk), 1)
+        for users_chunk in _chunks(users_ids, users_per_batch):
+            TimelineEntry.objects.bulk_create(
+                _entries(users_chunk, chunk), ignore_conflicts=True
+            )
+
+
+def backfill_timeline(user_id, author_id, batch_size=TIMELINE_BATCH_SIZE):
+    if is_pulled_author(author_id):
+        return
+    _insert_entries((user_id,), author_id, batch_size)
+    _invalidate_counts()
+
+
+def update_author_delivery(author_id, batch_size=TIMELINE_BATCH_SIZE):
+    # Между нижним и верхним порогом режим не меняется, иначе автор у
+    # границы переключался бы при каждой подписке и отписке.
+    if settings.POSTS_FOLLOW_FEED != FOLLOW_FEED_HYBRID:
+        return
+    stats = UserStats.objects.filter(user_id=author_id)
+    if stats.filter(
+        fanout_pulled=False,
+        followers_count__gt=settings.POSTS_FANOUT_FOLLOWERS_LIMIT,
+    ).update(fanout_pulled=True):
+        cache.delete(PULLED_AUTHORS_KEY)
+    elif stats.filter(
+        fanout_pulled=True,
+        followers_count__lte=settings.POSTS_FANOUT_FOLLOWERS_LOW_LIMIT,
+    ).update(fanout_pulled=False):
+        # Посты, вышедшие, пока автор был популярным, ни в одну ленту
+        # не попали: раздаем подписчикам последние из них.
+        cache.delete(PULLED_AUTHORS_KEY)
+        _insert_entries(
+            list(Follow.objects.filter(author_id=author_id).values_list(
+                "user_id", flat=True
+            )),
+            author_id,
+            batch_size,
+            limit=TIMELINE_BACKFILL_LIMIT,
+        )
+        _invalidate_counts()
+
+
+def sync_pulled_authors():
+    UserStats.objects.filter(
+        followers_count__gt=settings.POSTS_FANOUT_FOLLOWERS_LIMIT
+    ).update(fanout_pulled=True)
+    UserStats.objects.filter(
+        followers_count__lte=settings.POSTS_FANOUT_FOLLOWERS_LOW_LIMIT
+    ).update(fanout_pulled=False)
+    cache.delete(PULLED_AUTHORS_KEY)
+
+
+def prune_timeline(user_id, authors_ids):
+    TimelineEntry.objects.filter(
+        user_id=user_id, author_id__in=authors_ids
+    ).delete()
+    _invalidate_counts()
+
+
+def rebuild_timelines(batch_size=TIMELINE_BATCH_SIZE):
+    with transaction.atomic():
+        sync_pulled_authors()
+        TimelineEntry.objects.all().delete()
+        follows = Follow.objects.values_list(
+            "user_id", "author_id"
+        ).distinct()
+        for user_id, author_id in follows.iterator():
+            backfill_timeline(user_id, author_id, batch_size)
+    return TimelineEntry.objects.count()
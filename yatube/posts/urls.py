@@ -9,12 +9,20 @@ urlpatterns = [
     path("create/", views.post_create, name="post_create"),
     path("profile/<str:username>/", views.profile, name="profile"),
     path("posts/<int:post_id>/", views.post_detail, name="post_details"),
+    path(
+        "posts/<int:post_id>/comments/",
+        views.post_comments,
+        name="post_comments"
+    ),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
     path("group/<slug:slug>/", views.group_posts, name="group_list"),
+    path("tags/<str:name>/", views.tag_posts, name="tag_posts"),
     path(
         "posts/<int:post_id>/comment/", views.add_comment, name="add_comment"
     ),
     path("follow/", views.follow_index, name="follow_index"),
+    path("search/", views.search, name="search"),
+    path("lookup/", views.lookup, name="lookup"),
     path(
         "profile/<str:username>/follow/",
         views.profile_follow,
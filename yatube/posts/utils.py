@@ -1,8 +1,50 @@
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.utils.functional import SimpleLazyObject
 
+from .constants import (
+    COMMENTS_PER_PAGE, PAGINATION_CACHED, PAGINATION_COUNTLESS,
+    PAGINATION_CURSOR, PAGINATION_PAGE,
+)
+from .paginators import (
+    CachedCountPaginator, CountlessPaginator, CursorPaginator,
+)
+from .thumbnails import resolve_thumbnails
+from .variants import resolve_variants
 
-def create_pagination(objects, obj_on_page, page):
-    return Paginator(objects, obj_on_page).get_page(page)
+PAGINATORS = {
+    PAGINATION_PAGE: Paginator,
+    PAGINATION_CACHED: CachedCountPaginator,
+    PAGINATION_COUNTLESS: CountlessPaginator,
+    PAGINATION_CURSOR: CursorPaginator,
+}
+
+
+def create_pagination(objects, obj_on_page, page, feed=None):
+    mode = settings.POSTS_PAGINATION_MODES.get(feed, PAGINATION_PAGE)
+    return PAGINATORS[mode](objects, obj_on_page).get_page(page)
+
+
+def create_lazy_pagination(objects, obj_on_page, page, feed=None):
+    return SimpleLazyObject(
+        lambda: create_pagination(objects, obj_on_page, page, feed)
+    )
+
+
+def create_lazy_thumbnails(page_obj):
+    return SimpleLazyObject(lambda: resolve_thumbnails(page_obj))
+
+
+def create_lazy_variants(page_obj):
+    return SimpleLazyObject(lambda: resolve_variants(page_obj))
+
+
+def create_comments_pagination(post, cursor):
+    return CursorPaginator(
+        post.comments.select_related("author"),
+        COMMENTS_PER_PAGE,
+        ordering_field="created",
+    ).get_page(cursor)
 
 
 def get_author_name(author):
@@ -0,0 +1,101 @@
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from .constants import (
+    IMAGE_VARIANT_BATCH_SIZE, IMAGE_VARIANT_FORMATS, IMAGE_VARIANT_RATIO,
+    IMAGE_VARIANT_WIDTHS,
+)
+from .models import ImageVariant, Post
+
+VARIANTS_DIR = "variants"
+
+
+def supported_formats():
+    Image.init()
+    return [
+        variant_format for variant_format in IMAGE_VARIANT_FORMATS
+        if variant_format[0] in Image.SAVE
+    ]
+
+
+def variant_sizes(width):
+    ratio_width, ratio_height = IMAGE_VARIANT_RATIO
+    widths = [
+        variant_width for variant_width in IMAGE_VARIANT_WIDTHS
+        if variant_width <= width
+    ] or [width]
+    return [
+        (variant_width, max(1, variant_width * ratio_height // ratio_width))
+        for variant_width in widths
+    ]
+
+
+def _variant_name(source, width, extension):
+    stem = os.path.splitext(source)[0]
+    return f"{VARIANTS_DIR}/{stem}_{width}w.{extension}"
+
+
+def _encode(image, pil_format, options):
+    buffer = io.BytesIO()
+    if pil_format == "JPEG" or image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def delete_variants(source):
+    variants = ImageVariant.objects.filter(source=source)
+    for name in variants.values_list("file", flat=True):
+        default_storage.delete(name)
+    variants.delete()
+
+
+def generate_variants(source):
+    with default_storage.open(source) as file:
+        with Image.open(file) as image:
+            image = ImageOps.exif_transpose(image)
+            sizes = variant_sizes(image.width)
+            cropped = ImageOps.fit(image, sizes[-1], Image.LANCZOS)
+    variants = []
+    for width, height in reversed(sizes):
+        if cropped.width != width:
+            cropped = cropped.resize((width, height), Image.LANCZOS)
+        for pil_format, mime_type, extension, options in supported_formats():
+            content = _encode(cropped, pil_format, options)
+            variants.append(ImageVariant(
+                source=source,
+                mime_type=mime_type,
+                width=width,
+                height=height,
+                file=default_storage.save(
+                    _variant_name(source, width, extension),
+                    ContentFile(content),
+                ),
+                size=len(content),
+            ))
+    with transaction.atomic():
+        delete_variants(source)
+        ImageVariant.objects.bulk_create(variants)
+    return variants
+
+
+def resolve_variants(posts):
+    sources = {post.image.name for post in posts if post.image}
+    variants = {}
+    for variant in ImageVariant.objects.filter(source__in=sources):
+        variants.setdefault(variant.source, {}).setdefault(
+            variant.mime_type, []
+        ).append(variant)
+    return variants
+
+
+def sources_without_variants(batch_size=IMAGE_VARIANT_BATCH_SIZE):
+    sources = Post.objects.exclude(image="").exclude(image=None).exclude(
+        image__in=ImageVariant.objects.values("source")
+    ).order_by("image").values_list("image", flat=True).distinct()
+    return sources.iterator(chunk_size=batch_size)
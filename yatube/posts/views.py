@@ -1,19 +1,48 @@
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import condition
 
-from .constants import POST_PER_PAGE
+from .caching import cache_anonymous_response, fragment_cache_context
+from .conditional import (
+    feed_etag, feed_last_modified, follow_last_modified, post_etag,
+    post_last_modified, profile_etag, profile_generations,
+    profile_last_modified,
+)
+from .constants import COMMENTS_GENERATION, FEED_GENERATION, POST_PER_PAGE
+from .counters import get_user_stats
+from .feeds import get_follow_page
+from .follows import follow, unfollow
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
-from .utils import create_pagination, get_author_name
+from .lookup import autocomplete
+from .models import Group, Post, Tag, User
+from .paginators import CursorPaginator
+from .search import (
+    highlight, match_expression, search_posts, with_snippets,
+)
+from .tags import get_tag_posts, set_post_tags
+from .utils import (
+    create_comments_pagination, create_lazy_pagination,
+    create_lazy_thumbnails, create_lazy_variants, get_author_name,
+)
 
 
+@condition(etag_func=feed_etag, last_modified_func=feed_last_modified)
+@cache_anonymous_response("index")
 def index(request):
+    page = request.GET.get("page")
+    page_obj = create_lazy_pagination(
+        Post.objects.select_related("group", "author"),
+        POST_PER_PAGE,
+        page,
+        feed="index",
+    )
     context = {
-        "page_obj": create_pagination(
-            Post.objects.select_related("group", "author"),
-            POST_PER_PAGE,
-            request.GET.get("page")
-        ),
+        "page_obj": page_obj,
+        "thumbnails": create_lazy_thumbnails(page_obj),
+        "variants": create_lazy_variants(page_obj),
+        **fragment_cache_context(page),
     }
     return render(request, "posts/index.html", context)
 
@@ -24,7 +53,9 @@ def post_create(request):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        with transaction.atomic():
+            post.save()
+            set_post_tags(post)
         return redirect("posts:profile", request.user)
     context = {
         "form": form,
@@ -45,7 +76,8 @@ def post_edit(request, post_id):
         instance=post,
     )
     if form.is_valid():
-        form.save()
+        with transaction.atomic():
+            set_post_tags(form.save())
         return redirect("posts:post_details", post.id)
     context = {
         "form": form,
@@ -55,59 +87,146 @@ def post_edit(request, post_id):
     return render(request, "posts/post_create.html", context)
 
 
+@condition(etag_func=feed_etag, last_modified_func=feed_last_modified)
+@cache_anonymous_response("group_posts")
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
+    page = request.GET.get("page")
+    page_obj = create_lazy_pagination(
+        group.posts.select_related("author"),
+        POST_PER_PAGE,
+        page,
+        feed="group_posts",
+    )
     context = {
         "group": group,
-        "page_obj": create_pagination(
-            group.posts.select_related("author"),
-            POST_PER_PAGE,
-            request.GET.get("page")
-        ),
+        "page_obj": page_obj,
+        "thumbnails": create_lazy_thumbnails(page_obj),
+        "variants": create_lazy_variants(page_obj),
+        **fragment_cache_context(page),
     }
     return render(request, "posts/group_list.html", context)
 
 
+@condition(etag_func=feed_etag, last_modified_func=feed_last_modified)
+@cache_anonymous_response("tag_posts")
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    page = request.GET.get("page")
+    page_obj = create_lazy_pagination(
+        get_tag_posts(tag),
+        POST_PER_PAGE,
+        page,
+        feed="tag_posts",
+    )
+    context = {
+        "tag": tag,
+        "page_obj": page_obj,
+        "thumbnails": create_lazy_thumbnails(page_obj),
+        "variants": create_lazy_variants(page_obj),
+        **fragment_cache_context(page),
+    }
+    return render(request, "posts/tag_list.html", context)
+
+
+@condition(etag_func=profile_etag, last_modified_func=profile_last_modified)
+@cache_anonymous_response("profile", view_generations=profile_generations)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related("stats"), username=username
+    )
+    stats = get_user_stats(author)
     following = False
     if (request.user.is_authenticated
             and request.user.follower.filter(author=author).exists()):
         following = True
+    posts = author.posts.select_related("group")
+    page = request.GET.get("page")
+    page_obj = create_lazy_pagination(
+        posts,
+        POST_PER_PAGE,
+        page,
+        feed="profile",
+    )
     context = {
-        "page_obj": create_pagination(
-            author.posts.select_related("group"),
-            POST_PER_PAGE,
-            request.GET.get("page")
-        ),
+        "page_obj": page_obj,
+        "thumbnails": create_lazy_thumbnails(page_obj),
+        "variants": create_lazy_variants(page_obj),
         "author": author,
         "author_full_name": get_author_name(author),
-        "count_posts": author.posts.count(),
+        "count_posts": stats.posts_count,
+        "stats": stats,
         "following": following,
+        **fragment_cache_context(page),
     }
     return render(request, "posts/profile.html", context)
 
 
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
+@cache_anonymous_response(
+    "post_detail", generations=(FEED_GENERATION, COMMENTS_GENERATION)
+)
 def post_detail(request, post_id):
     post = get_object_or_404(
-        Post.objects.select_related(
-            "author", "group"
-        )
-        .prefetch_related(
-            "comments__author"
-        ),
+        Post.objects.select_related("author__stats", "group"),
         id=post_id
     )
     context = {
         "post": post,
-        "count_posts": post.author.posts.count(),
+        "count_posts": get_user_stats(post.author).posts_count,
         "author_full_name": get_author_name(post.author),
         "form": CommentForm(),
-        "comments": post.comments.all(),
+        "comments": create_comments_pagination(
+            post, request.GET.get("page")
+        ),
+        "thumbnails": create_lazy_thumbnails((post,)),
+        "variants": create_lazy_variants((post,)),
     }
     return render(request, "posts/post_detail.html", context)
 
 
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
+@cache_anonymous_response(
+    "post_comments", generations=(FEED_GENERATION, COMMENTS_GENERATION)
+)
+def post_comments(request, post_id):
+    post = get_object_or_404(Post.objects.only("id"), id=post_id)
+    context = {
+        "post": post,
+        "comments": create_comments_pagination(
+            post, request.GET.get("page")
+        ),
+    }
+    return render(request, "includes/comments_list.html", context)
+
+
+@cache_anonymous_response("search")
+def search(request):
+    query = request.GET.get("q", "").strip()
+    page_obj = None
+    if match_expression(query):
+        page_obj = CursorPaginator(
+            with_snippets(search_posts(query)).select_related(
+                "author", "group"
+            ),
+            POST_PER_PAGE,
+            ordering_field="score",
+        ).get_page(request.GET.get("page"))
+        for post in page_obj:
+            post.highlighted = highlight(post.snippet)
+    context = {
+        "query": query,
+        "page_obj": page_obj,
+    }
+    return render(request, "posts/search.html", context)
+
+
+def lookup(request):
+    return JsonResponse(
+        {"results": autocomplete(request.GET.get("q", ""))}
+    )
+
+
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(Post, id=post_id)
@@ -116,43 +235,33 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment.save()
     return redirect('posts:post_details', post_id)
 
 
 @login_required
+@condition(etag_func=feed_etag, last_modified_func=follow_last_modified)
 def follow_index(request):
+    page_obj = get_follow_page(request.user, request.GET.get("page"))
     return render(
         request,
         'posts/follow.html',
         context={
-            "page_obj": create_pagination(
-                Post.objects.filter(
-                    author__following__user=request.user,
-                ).select_related("author", "group"),
-                POST_PER_PAGE,
-                request.GET.get("page")
-            ),
+            "page_obj": page_obj,
+            "thumbnails": create_lazy_thumbnails(page_obj),
+            "variants": create_lazy_variants(page_obj),
         },
     )
 
 
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
-    user = request.user
-    is_follower = user.follower.filter(author=author).exists()
-    if user != author and not is_follower:
-        Follow.objects.create(user=user, author=author)
+    follow(request.user, get_object_or_404(User, username=username))
     return redirect("posts:profile", username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
-    user = request.user
-    is_follower = user.follower.filter(author=author).exists()
-    if user != author and is_follower:
-        following_object = Follow.objects.filter(user=user, author=author)
-        following_object.delete()
+    unfollow(request.user, get_object_or_404(User, username=username))
     return redirect("posts:profile", username)
@@ -0,0 +1,18 @@
+document.addEventListener("click", function (event) {
+  var link = event.target.closest(".js-more-comments");
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.dataset.fragment, {credentials: "same-origin"})
+    .then(function (response) {
+      return response.ok ? response.text() : Promise.reject(response);
+    })
+    .then(function (html) {
+      link.insertAdjacentHTML("afterend", html);
+      link.remove();
+    })
+    .catch(function () {
+      window.location = link.href;
+    });
+});
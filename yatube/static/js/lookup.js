@@ -0,0 +1,24 @@
+document.querySelectorAll("[data-lookup-url]").forEach(function (input) {
+  var list = document.getElementById(input.dataset.lookupList);
+  var timer = null;
+  input.addEventListener("input", function () {
+    clearTimeout(timer);
+    timer = setTimeout(function () {
+      var url = input.dataset.lookupUrl + "?q=" + encodeURIComponent(input.value);
+      fetch(url, {credentials: "same-origin"})
+        .then(function (response) {
+          return response.json();
+        })
+        .then(function (data) {
+          list.innerHTML = "";
+          data.results.forEach(function (result) {
+            var link = document.createElement("a");
+            link.className = "list-group-item list-group-item-action";
+            link.href = result.url;
+            link.textContent = result.label;
+            list.appendChild(link);
+          });
+        });
+    }, 150);
+  });
+});
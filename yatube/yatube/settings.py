@@ -9,7 +9,8 @@ load_dotenv(dotenv_path)
 
 SECRET_KEY = str(os.getenv('SECRET_KEY'))
 
-DEBUG = True
+# Для разработки по умолчанию; образ Docker задает DEBUG=False.
+DEBUG = os.getenv('DEBUG', 'True') == 'True'
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -49,6 +50,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.AnonymousRequestMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -118,12 +120,57 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+STATICFILES_STORAGE = 'core.assets.AssetsStorage'
+# Хешированные имена из манифеста build_assets; включите, когда статику
+# раздает веб-сервер или serve_file из STATIC_ROOT (так в образе Docker).
+ASSETS_USE_MANIFEST = os.getenv('ASSETS_USE_MANIFEST', str(not DEBUG)) == 'True'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# None, 'x-sendfile' (Apache, lighttpd) или 'x-accel-redirect' (nginx).
+FILES_SENDFILE_BACKEND = None
+FILES_ACCEL_REDIRECT_PREFIX = '/internal'
+FILES_MAX_AGE = 60 * 60
+FILES_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+POSTS_PAGINATION_MODES = {
+    'index': 'page',
+    'group_posts': 'page',
+    'profile': 'page',
+    'follow_index': 'page',
+    'tag_posts': 'page',
+}
+
+POSTS_FOLLOW_FEED = 'join'
+POSTS_FANOUT_FOLLOWERS_LIMIT = 1000
+# Автор снова получает рассылку, только опустившись до нижнего порога.
+POSTS_FANOUT_FOLLOWERS_LOW_LIMIT = 900
+
+# В режиме отладки, в том числе в тестах, миниатюры строятся прямо в
+# запросе: фоновые потоки конкурируют с ним за блокировку SQLite.
+POSTS_THUMBNAIL_WORKERS = int(
+    os.getenv('POSTS_THUMBNAIL_WORKERS', 0 if DEBUG else 2)
+)
+
+POSTS_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+POSTS_IMAGE_MAX_PIXELS = 40_000_000
+POSTS_IMAGE_MAX_SIDE = 2560
+
+FILE_UPLOAD_HANDLERS = ['posts.ingest.BoundedUploadHandler']
+
+POSTS_RESPONSE_CACHE_TIMEOUTS = {
+    'index': 60 * 5,
+    'group_posts': 60 * 5,
+    'tag_posts': 60 * 5,
+    'profile': 60 * 5,
+    'post_detail': 60 * 15,
+    'search': 60 * 5,
+}
@@ -1,7 +1,9 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.assets import is_hashed_asset
+from core.files import serve_file
 
 urlpatterns = [
     path("", include("posts.urls", namespace="posts")),
@@ -9,6 +11,19 @@ urlpatterns = [
     path("auth/", include("django.contrib.auth.urls")),
     path("about/", include("about.urls", namespace="about")),
     path("admin/", admin.site.urls),
+    re_path(
+        r"^%s(?P<path>.+)$" % settings.MEDIA_URL.lstrip("/"),
+        serve_file,
+        {"document_root": settings.MEDIA_ROOT},
+    ),
+    re_path(
+        r"^%s(?P<path>.+)$" % settings.STATIC_URL.lstrip("/"),
+        serve_file,
+        {
+            "document_root": settings.STATIC_ROOT,
+            "is_immutable": is_hashed_asset,
+        },
+    ),
 ]
 handler400 = "core.views.bad_request"
 handler403 = "core.views.permission_denied"
@@ -17,6 +32,3 @@ handler500 = "core.views.server_error"
 if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )